@@ -1,100 +1,121 @@
-import pickle
-import joblib
+import json
+import os
 import warnings
-import fitz
-import nltk
 import streamlit as st
 import pandas as pd
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 from streamlit_extras.metric_cards import style_metric_cards
+from aplicacao.utils import configuracao
+from aplicacao.utils.artefato_vagas import CAMINHO_META_VAGAS
+from aplicacao.utils.cache_cv import CacheCV, hash_conteudo, montar_chave
+from aplicacao.utils.executor_inferencia import ServidorOcupado
+from aplicacao.utils.extracao_pdf import extrair_texto_pdf
+from aplicacao.utils.motor_recomendacao import CAMINHO_TABELA_ENSEMBLE
+from aplicacao.utils.predicao_vagas import (
+    VERSAO_MODELO_CV, codificar_cv, executor_inferencia, metricas_inferencia, obter_catalogo,
+    predict_jobs_for_cv, valores_filtros)
+from aplicacao.utils.registro_modelos import registro
+from aplicacao.utils.servico_inferencia import ServicoIndisponivel, cliente_inferencia
+from aplicacao.utils.snapshot_dados import impressao_digital
 
-# Configurações iniciais
-try:
-    nltk.data.find("tokenizers/punkt")
-except LookupError:
-    nltk.download("punkt")
-
-try:
-    nltk.data.find("corpora/stopwords")
-except LookupError:
-    nltk.download("stopwords")
 warnings.simplefilter("ignore")
 
-
-# # == == == == == == == == == == == == == == == == == == == == == == ==
-# # FUNÇÕES DE CARREGAMENTO E PROCESSAMENTO
-# # == == == == == == == == == == == == == == == == == == == == == == ==
-
-
-# @st.cache_resource
-def load_models():
-    """Carrega os modelos e dados necessários"""
-    with open("aplicacao/modelo/vagas.pkl", "rb") as f:
-        jobs = pickle.load(f)
-
-    logreg = joblib.load("aplicacao/modelo/logistic_model.pkl")
-    xgb = joblib.load("aplicacao/modelo/xgboost_model.pkl")
-    embedding_model = SentenceTransformer(
-        'paraphrase-multilingual-MiniLM-L12-v2')
-
-    job_data = joblib.load("aplicacao/modelo/job_data.pkl")
-    return jobs, logreg, xgb, embedding_model, job_data["job_ids"], job_data["job_titles"], job_data["job_embeddings"]
-
-
-jobs, logreg, xgb, embedding_model, job_ids, job_titles, job_embeddings = load_models()
-
-
-def preprocess(text):
-    import re
-    import string
-    from nltk.corpus import stopwords
-
-    stop_words = set(stopwords.words('portuguese'))
-
-    text = text.lower()
-    text = re.sub(r'\d+', '', text)
-    text = text.translate(str.maketrans('', '', string.punctuation))
-
-    # tokenização simples
-    tokens = [word for word in text.split() if word not in stop_words and len(word) > 2]
-
-    return ' '.join(tokens)
-
-
-def predict_jobs_for_cv(cv_text, top_n=5):
-    """Prediz as melhores vagas para um currículo"""
-    cleaned_cv = preprocess(cv_text)
-    cv_vec = embedding_model.encode([cleaned_cv])
-    sims = cosine_similarity(cv_vec, job_embeddings).flatten()
-
-    results = []
-    for i, sim in enumerate(sims):
-        logreg_prob = logreg.predict_proba([[sim]])[0][1]
-        xgb_prob = xgb.predict_proba([[sim]])[0][1]
-        ensemble_prob = (logreg_prob + xgb_prob) / 2
-
-        job = jobs.get(job_ids[i], {})
-        results.append({
-            "id_vaga": job_ids[i],
-            "titulo_da_vaga": job.get("informacoes_basicas", {}).get("titulo_vaga", "N/A"),
-            "area": job.get("perfil_vaga", {}).get("areas_atuacao", "N/A"),
-            "habilidades": job.get("perfil_vaga", {}).get("competencia_tecnicas_e_comportamentais", "Não informado"),
-            "atividades": job.get("perfil_vaga", {}).get("principais_atividades", "Não informado"),
-            "similaridade": sim,
-            "probabilidade_de_contratacao": ensemble_prob
-        })
-
-    return pd.DataFrame(sorted(results, key=lambda x: x["probabilidade_de_contratacao"], reverse=True)[:top_n])
-
-
-def extract_text_from_pdf(file):
-    """Extrai texto de arquivo PDF"""
-    text = ""
-    with fitz.open(stream=file.read(), filetype="pdf") as doc:
-        for page in doc:
-            text += page.get_text()
-    return text
+# Resultados em cache valem só para este catálogo, esta tabela e este tipo de busca
+versao_catalogo = json.dumps([
+    impressao_digital([c for c in (CAMINHO_META_VAGAS, CAMINHO_TABELA_ENSEMBLE) if os.path.exists(c)]),
+    configuracao.INDICE_VAGAS])
+cache_cv = CacheCV(configuracao.CACHE_CV_MEMORIA, configuracao.CACHE_CV_DISCO)
+# Limites que decidem o texto extraído de um PDF; o de tempo fica fora porque um texto
+# cortado pelo prazo não vai para o cache, e o de tamanho só recusa o arquivo
+limites_pdf = [configuracao.PDF_MAX_PAGINAS, configuracao.PDF_CARACTERES_SUFICIENTES]
+
+
+def no_servico_ou_local(no_servico, local):
+    """`no_servico(cliente)` no serviço de inferência configurado; sem serviço, ou se ele
+    não responder, `local()` com os modelos deste processo"""
+    if cliente_inferencia is not None:
+        try:
+            return no_servico(cliente_inferencia)
+        except ServicoIndisponivel as erro:
+            print(f"Serviço de inferência indisponível, usando o modelo local: {erro}")
+    return local()
+
+
+def opcoes_filtros():
+    return no_servico_ou_local(lambda cliente: cliente.valores_filtros(), valores_filtros)
+
+
+def detalhes_vagas(ids):
+    """Registros das vagas recomendadas, guardados na sessão enquanto a recomendação
+    não muda (sem uma ida ao serviço a cada interação)"""
+    guardados = st.session_state.get('detalhes_vagas')
+    if guardados is None or guardados[0] != ids:
+        vagas = no_servico_ou_local(
+            lambda cliente: cliente.vagas(ids),
+            lambda: {jid: obter_catalogo().jobs.get(jid, {}) for jid in ids})
+        guardados = st.session_state['detalhes_vagas'] = (ids, vagas)
+    return guardados[1]
+
+
+def mostrar_fila_inferencia():
+    """Métricas da fila de inferência; as do serviço custam uma ida e volta a ele e só
+    são consultadas quando pedidas"""
+    if cliente_inferencia is not None and not st.button("Consultar fila do serviço",
+                                                        key="consultar_fila_inferencia"):
+        st.caption(f"Fila do serviço de inferência ({cliente_inferencia.endereco}).")
+        return
+    try:
+        # Com o serviço de inferência, a fila que importa é a dele
+        metricas, lotes = no_servico_ou_local(lambda cliente: cliente.metricas(), metricas_inferencia)
+    except (ServidorOcupado, RuntimeError) as erro:
+        st.warning(f"Métricas da fila indisponíveis: {erro}")
+        return
+
+    col_fila, col_espera, col_duracao = st.columns(3)
+    col_fila.metric("Na fila / executando", f"{metricas['na_fila']} / {metricas['executando']}")
+    col_espera.metric("Espera p95", f"{metricas['espera_p95_ms']:.0f} ms")
+    col_duracao.metric("Duração p95", f"{metricas['duracao_p95_ms']:.0f} ms")
+    st.caption(f"{metricas['aceitas']} aceitas · {metricas['recusadas']} recusadas (fila cheia) · "
+               f"{metricas['expiradas']} expiradas · {metricas['erros']} com erro · "
+               f"{metricas['trabalhadores']} trabalhadores × "
+               f"{metricas['threads_por_trabalhador']} threads")
+    st.caption(f"Lotes de codificação: {lotes['lotes']} lotes, {lotes['tamanho_medio']:.1f} CVs "
+               f"em média, espera p95 até o lote {lotes['espera_p95_ms']:.0f} ms")
+
+
+def recomendar_para_pdf(chave_cv, cv_text, top_n=5, filtros=None):
+    """Recomendações de um PDF já extraído (`chave_cv` identifica o texto: mesmo PDF e
+    mesmos limites de extração), reaproveitando embedding e resultado em cache; o que falta calcular vai para o
+    serviço de inferência, se configurado, ou para o executor de inferência deste
+    processo (levanta ServidorOcupado com a fila cheia)"""
+    cv_vec = cache_cv.obter_ou_calcular(
+        "embedding", montar_chave("embedding", chave_cv, VERSAO_MODELO_CV),
+        lambda: no_servico_ou_local(lambda cliente: cliente.codificar(cv_text),
+                                    lambda: codificar_cv(cv_text)))
+    return cache_cv.obter_ou_calcular(
+        "resultado",
+        montar_chave("resultado", chave_cv, VERSAO_MODELO_CV, versao_catalogo, top_n, filtros),
+        lambda: no_servico_ou_local(
+            lambda cliente: cliente.recomendar(cv_vec, top_n, filtros),
+            lambda: executor_inferencia.executar(predict_jobs_for_cv, cv_text, top_n, filtros,
+                                                 cv_vec=cv_vec)))
+
+
+MOTIVOS_PARADA = {
+    "texto_suficiente": "texto suficiente para a análise",
+    "limite_paginas": "limite de páginas",
+    "tempo": "limite de tempo",
+}
+
+
+def mostrar_relatorio_extracao(relatorio):
+    """Páginas lidas e tempo de cada etapa da extração"""
+    tempos = relatorio["tempos"]
+    st.caption(
+        f"Extração: {relatorio['paginas_lidas']} de {relatorio['paginas_total']} páginas em "
+        f"{sum(tempos.values()):.2f}s (abrir {tempos['abrir']:.2f}s · "
+        f"páginas {tempos['paginas']:.2f}s · juntar {tempos['juntar']:.3f}s)")
+    if relatorio["motivo_parada"] in MOTIVOS_PARADA:
+        st.caption(f"Leitura interrompida: {MOTIVOS_PARADA[relatorio['motivo_parada']]}.")
 
 # ==============================================
 # INTERFACE PRINCIPAL
@@ -107,10 +128,11 @@ def predicao_1():
     if 'df_recomendacoes' not in st.session_state:
         st.session_state['df_recomendacoes'] = pd.DataFrame()
 
-    # Supondo que jobs esteja disponível globalmente ou carregado antes
-    global jobs
-    if 'jobs' not in globals():
-        jobs = {}
+    # Com o serviço de inferência o catálogo local só é carregado se o serviço falhar
+    if cliente_inferencia is None and not registro.pronto("catalogo"):
+        with st.spinner("Carregando vagas..."):
+            obter_catalogo()
+    valores = opcoes_filtros()
 
     # Header moderno
     with st.container():
@@ -141,9 +163,43 @@ def predicao_1():
             </div>
             """, unsafe_allow_html=True)
 
+    with st.expander("Filtrar vagas", expanded=False):
+        col_estado, col_nivel, col_cliente = st.columns(3)
+        with col_estado:
+            estados = st.multiselect("Estado", valores["estado"])
+        with col_nivel:
+            niveis = st.multiselect("Nível profissional", valores["nivel_profissional"])
+        with col_cliente:
+            clientes = st.multiselect("Cliente", valores["cliente"])
+    filtros = {"estado": estados, "nivel_profissional": niveis, "cliente": clientes}
+
     if uploaded_file:
-        with st.spinner('Analisando seu currículo...'):
-            cv_text = extract_text_from_pdf(uploaded_file)
+        # Um CV enviado durante o aquecimento espera o modelo que já está carregando
+        modelo_pronto = cliente_inferencia is not None or registro.pronto("modelo_embeddings")
+        mensagem = ('Analisando seu currículo...' if modelo_pronto
+                    else 'Aguardando o modelo terminar de carregar e analisando seu currículo...')
+        with st.spinner(mensagem):
+            if uploaded_file.size > configuracao.PDF_MAX_BYTES:
+                st.error(f"⚠️ O arquivo excede o limite de {configuracao.PDF_MAX_BYTES / 2**20:.0f} MB.")
+                return
+
+            conteudo = uploaded_file.getvalue()
+            chave_pdf = hash_conteudo(conteudo)
+            relatorio = {}
+
+            def extrair():
+                relatorio.update(extrair_texto_pdf(conteudo))
+                return relatorio["texto"]
+
+            chave_cv = montar_chave("texto", chave_pdf, limites_pdf)
+            cv_text = cache_cv.obter_ou_calcular(
+                "texto", chave_cv, extrair,
+                guardar=lambda _: relatorio["motivo_parada"] != "tempo")
+            if relatorio.get("motivo_parada") == "tempo":
+                # Texto parcial: embedding e resultado ficam presos a este texto, não ao PDF
+                chave_cv = montar_chave("texto", hash_conteudo(cv_text.encode("utf-8")))
+            if relatorio:
+                mostrar_relatorio_extracao(relatorio)
 
             if not cv_text.strip():
                 st.error("""
@@ -170,11 +226,19 @@ def predicao_1():
                 return
 
             # Geração de recomendações
-            df_recomendacoes = predict_jobs_for_cv(cv_text)
+            try:
+                df_recomendacoes = recomendar_para_pdf(chave_cv, cv_text, filtros=filtros)
+            except ServidorOcupado:
+                st.warning("⏳ Muitas análises em andamento no momento. Tente novamente em alguns instantes.")
+                return
 
             if isinstance(df_recomendacoes, pd.DataFrame) and not df_recomendacoes.empty:
                 st.session_state['cv_text'] = cv_text
                 st.session_state['df_recomendacoes'] = df_recomendacoes
+            elif any(filtros.values()):
+                st.session_state['df_recomendacoes'] = pd.DataFrame()
+                st.warning("Nenhuma vaga atende aos filtros selecionados.")
+                return
             else:
                 st.error("❌ Nenhuma recomendação válida foi gerada.")
                 return
@@ -235,6 +299,7 @@ def predicao_1():
         st.markdown("---")
         st.markdown("###  Detalhes das Vagas Recomendadas")
 
+        jobs = detalhes_vagas(df_recomendacoes['id_vaga'].tolist())
         tabs = st.tabs([f"Vaga #{i+1}" for i in range(len(df_recomendacoes))])
 
         for idx, (tab, (_, row)) in enumerate(zip(tabs, df_recomendacoes.iterrows())):
@@ -274,6 +339,14 @@ def predicao_1():
     else:
         st.info("Faça o upload do seu currículo em PDF para descobrir as vagas mais compatíveis com seu perfil.")
 
+    with st.expander("Cache de currículos", expanded=False):
+        estatisticas = pd.DataFrame(cache_cv.estatisticas()).T.rename(columns={
+            "memoria": "Acertos (memória)", "disco": "Acertos (disco)", "faltas": "Faltas"})
+        st.dataframe(estatisticas, use_container_width=True)
+
+    with st.expander("Fila de inferência", expanded=False):
+        mostrar_fila_inferencia()
+
 # def predicao_1():
 #         # Inicialização segura dos estados usados
 #     if 'cv_text' not in st.session_state:
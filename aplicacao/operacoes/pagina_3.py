@@ -1,6 +1,7 @@
 import streamlit as st
 import plotly.express as px
 from streamlit_extras.metric_cards import style_metric_cards
+from aplicacao.utils.utils import contar_presentes
 
 def analise_vaga_03(vagas_df):
     st.title("Painel de Análise de Vagas")
@@ -77,7 +78,7 @@ def analise_vaga_03(vagas_df):
     ])
 
     with tab1:
-        estado_df = vagas_filtradas['perfil_vaga_estado'].value_counts().reset_index()
+        estado_df = contar_presentes(vagas_filtradas['perfil_vaga_estado']).reset_index()
         estado_df.columns = ['estado', 'quantidade']
 
         fig_estado = px.bar(
@@ -92,7 +93,7 @@ def analise_vaga_03(vagas_df):
         st.plotly_chart(fig_estado, use_container_width=True)
 
     with tab2:
-        ingles_df = vagas_filtradas['perfil_vaga_nivel_ingles'].value_counts().reset_index()
+        ingles_df = contar_presentes(vagas_filtradas['perfil_vaga_nivel_ingles']).reset_index()
         ingles_df.columns = ['nivel_ingles', 'quantidade']
 
         fig_ingles = px.pie(
@@ -105,7 +106,7 @@ def analise_vaga_03(vagas_df):
         st.plotly_chart(fig_ingles, use_container_width=True)
 
     with tab3:
-        areas_df = vagas_filtradas['perfil_vaga_areas_atuacao'].value_counts().reset_index()
+        areas_df = contar_presentes(vagas_filtradas['perfil_vaga_areas_atuacao']).reset_index()
         areas_df.columns = ['area', 'quantidade']
 
         fig_areas = px.treemap(
@@ -1,37 +1,92 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 from streamlit_extras.metric_cards import style_metric_cards
-
-
-def analise_candidato_04(prospects_json):
+from aplicacao.utils.base_candidatos import abrir_base_candidatos
+from aplicacao.utils.carregar_dados import garantir_dados_extraidos
+from aplicacao.utils.utils import contar_presentes
+
+
+# Candidatos oferecidos na caixa de seleção; os demais são consultados pelo código
+LIMITE_OPCOES_CANDIDATOS = 200
+
+
+@st.cache_resource(show_spinner=False)
+def obter_base_candidatos():
+    """Base indexada de candidatos, gerada fora do app por modelo.gerar_base_candidatos()"""
+    garantir_dados_extraidos()
+    base = abrir_base_candidatos()
+    if base is None:
+        # Exceção em vez de None para o cache não guardar a ausência da base
+        raise FileNotFoundError("Base de candidatos ausente ou desatualizada.")
+    return base
+
+
+def detalhes_candidato(filtered_df):
+    st.markdown("###  Detalhes do Candidato")
+    if filtered_df.empty:
+        st.info("Nenhum candidato na seleção atual.")
+        return
+
+    try:
+        base_candidatos = obter_base_candidatos()
+    except FileNotFoundError:
+        st.warning("Base de candidatos indisponível. Gere-a com modelo.gerar_base_candidatos().")
+        return
+
+    codigo_digitado = st.text_input(
+        "Código do Candidato",
+        key="codigo_candidato_detalhe",
+        help="Consulta qualquer candidato da base, mesmo fora da lista abaixo"
+    ).strip()
+
+    opcoes = filtered_df.head(LIMITE_OPCOES_CANDIDATOS)
+    nomes = dict(zip(opcoes['codigo'], opcoes['nome']))
+    codigo = st.selectbox(
+        "Selecione o Candidato",
+        list(nomes),
+        format_func=lambda c: f"{nomes[c]} ({c})",
+        key="candidato_detalhe",
+        disabled=bool(codigo_digitado)
+    )
+    if len(filtered_df) > LIMITE_OPCOES_CANDIDATOS:
+        st.caption(f"Lista com os primeiros {LIMITE_OPCOES_CANDIDATOS} de {len(filtered_df)} "
+                   "candidatos filtrados; para os demais, informe o código.")
+    codigo = codigo_digitado or codigo
+
+    candidato = base_candidatos.obter(codigo)
+    if candidato is None:
+        st.warning("Candidato não encontrado na base de applicants.")
+        return
+
+    basicas = candidato.get('infos_basicas', {})
+    profissionais = candidato.get('informacoes_profissionais', {})
+    formacao = candidato.get('formacao_e_idiomas', {})
+
+    col_info1, col_info2 = st.columns(2)
+    with col_info1:
+        st.markdown(f"**Nome:** {basicas.get('nome', 'Não informado')}")
+        st.markdown(f"**Título Profissional:** {profissionais.get('titulo_profissional') or 'Não informado'}")
+        st.markdown(f"**Área de Atuação:** {profissionais.get('area_atuacao') or 'Não informado'}")
+        st.markdown(f"**Nível Profissional:** {profissionais.get('nivel_profissional') or 'Não informado'}")
+    with col_info2:
+        st.markdown(f"**Nível Acadêmico:** {formacao.get('nivel_academico') or 'Não informado'}")
+        st.markdown(f"**Inglês:** {formacao.get('nivel_ingles') or 'Não informado'}")
+        st.markdown(f"**Espanhol:** {formacao.get('nivel_espanhol') or 'Não informado'}")
+        st.markdown(f"**Local:** {basicas.get('local') or 'Não informado'}")
+
+    with st.expander("🛠 **Conhecimentos Técnicos**", expanded=False):
+        st.write(profissionais.get('conhecimentos_tecnicos') or "Informações não disponíveis para este candidato.")
+
+    with st.expander("📄 **Currículo**", expanded=False):
+        st.write(candidato.get('cv_pt') or "Currículo não disponível para este candidato.")
+
+
+def analise_candidato_04(prospects_df):
+    """`prospects_df` é o quadro de preparar_candidatos_df.montar_painel_candidatos,
+    compartilhado entre as sessões: aqui ele só é filtrado e agregado"""
 
     st.title(" Painel de Análise de Candidatos")
 
-
-    # Processamento dos dados
-    lista_prospects = []
-    for vaga_id, vaga_info in prospects_json.items():
-        titulo = vaga_info.get("titulo", "")
-        modalidade = vaga_info.get("modalidade", "")
-        for prospect in vaga_info.get("prospects", []):
-            prospect['titulo_vaga'] = titulo
-            prospect['modalidade'] = modalidade
-            lista_prospects.append(prospect)
-
-    prospects_df = pd.DataFrame(lista_prospects)
-
-    # Agrupar status de aprovação
-    aprovados = [
-        "Aprovado",
-        "Contratado como Hunting",
-        "Contratado pela Decision",
-        "Proposta Aceita"
-    ]
-    prospects_df['situacao_candidado_agrupado'] = prospects_df['situacao_candidado'].apply(
-        lambda x: "Aprovado" if x in aprovados else x
-    )
-
     # Métricas resumidas
     st.markdown("### Visão Geral")
     col1, col2, col3 = st.columns(3)
@@ -44,8 +99,8 @@ def analise_candidato_04(prospects_json):
         )
 
     with col2:
-        aprovados_count = len(
-            prospects_df[prospects_df['situacao_candidado_agrupado'] == "Aprovado"])
+        aprovados_count = int(
+            (prospects_df['situacao_candidado_agrupado'] == "Aprovado").sum())
         st.metric(
             label="Candidatos Aprovados",
             value=aprovados_count,
@@ -85,8 +140,8 @@ def analise_candidato_04(prospects_json):
                 prospects_df['titulo_vaga'].unique()
             )
 
-    # Aplicar filtros
-    filtered_df = prospects_df.copy()
+    # Aplicar filtros (fatias do quadro compartilhado, sem copiá-lo)
+    filtered_df = prospects_df
     if situacao_filtro:
         filtered_df = filtered_df[filtered_df['situacao_candidado_agrupado'].isin(
             situacao_filtro)]
@@ -115,14 +170,15 @@ def analise_candidato_04(prospects_json):
         hide_index=True
     )
 
+    detalhes_candidato(filtered_df)
+
     # Visualizações gráficas
     st.markdown("###  Análises Gráficas")
     tab1, tab2, tab3 = st.tabs(
         ["Status dos Candidatos", "Distribuição por Recrutador", "Evolução Temporal"])
 
     with tab1:
-        status_df = filtered_df['situacao_candidado_agrupado'].value_counts(
-        ).reset_index()
+        status_df = contar_presentes(filtered_df['situacao_candidado_agrupado']).reset_index()
         status_df.columns = ['situacao', 'quantidade']
 
         fig_status = px.pie(
@@ -135,7 +191,7 @@ def analise_candidato_04(prospects_json):
         st.plotly_chart(fig_status, use_container_width=True)
 
     with tab2:
-        recrutador_df = filtered_df['recrutador'].value_counts().reset_index()
+        recrutador_df = contar_presentes(filtered_df['recrutador']).reset_index()
         recrutador_df.columns = ['recrutador', 'quantidade']
 
         fig_recrutador = px.bar(
@@ -150,11 +206,10 @@ def analise_candidato_04(prospects_json):
         st.plotly_chart(fig_recrutador, use_container_width=True)
 
     with tab3:
-        if not filtered_df.empty and 'data_candidatura' in filtered_df.columns:
-            filtered_df['data_candidatura'] = pd.to_datetime(
-                filtered_df['data_candidatura'], errors='coerce')
-            temporal_df = filtered_df.set_index(
-                'data_candidatura').resample('M').size().reset_index()
+        if not filtered_df.empty and filtered_df['mes_candidatura'].notna().any():
+            # Contagem por mês já calculado; o resample só preenche os meses sem candidaturas
+            temporal_df = filtered_df['mes_candidatura'].value_counts(
+            ).resample('M').sum().reset_index()
             temporal_df.columns = ['data', 'quantidade']
 
             fig_temporal = px.line(
@@ -0,0 +1,134 @@
+"""Artefato das vagas para o servidor: embeddings float32 já normalizados em um .npy
+aberto com mmap (as páginas ficam no cache do SO e são compartilhadas entre os
+processos do Streamlit) e ids/títulos em um JSON pequeno ao lado.
+
+Cada gravação (embeddings, int8, IVF, meta e vagas.pkl) vai para uma pasta própria,
+uma geração, publicada pela troca de um único link (ARTEFATO_VAGAS_ATUAL). Quem
+carrega resolve o link uma vez e lê todos os arquivos da mesma geração.
+"""
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from aplicacao.utils.carregar_dados import trocar_link
+from aplicacao.utils.indice_ivf import NOME_INDICE_IVF, salvar_indice_ivf
+from aplicacao.utils.indice_quantizado import IndiceInt8, quantizar_int8
+from aplicacao.utils.preprocessamento import VERSAO_PREPROCESSAMENTO
+
+PASTA_MODELO = "aplicacao/modelo"
+PASTA_GERACOES_VAGAS = os.path.join(PASTA_MODELO, "vagas_geracoes")
+ARTEFATO_VAGAS_ATUAL = os.path.join(PASTA_MODELO, "vagas_atual")
+NOME_EMBEDDINGS = "job_embeddings.npy"
+NOME_META = "job_meta.json"
+NOME_CODIGOS_INT8 = "job_embeddings_int8.npy"
+NOME_ESCALAS_INT8 = "job_escalas_int8.npy"
+NOME_VAGAS_PKL = "vagas.pkl"
+CAMINHO_META_VAGAS = os.path.join(ARTEFATO_VAGAS_ATUAL, NOME_META)
+
+
+def pasta_artefato_vagas():
+    """Pasta da geração publicada; sem gerações, a pasta do modelo (arquivos soltos,
+    como eram gravados antes)"""
+    if os.path.islink(ARTEFATO_VAGAS_ATUAL):
+        return os.path.realpath(ARTEFATO_VAGAS_ATUAL)
+    return PASTA_MODELO
+
+
+def normalizar(vetores):
+    """Vetores float32 com norma L2 unitária (vetores nulos ficam nulos)"""
+    vetores = np.asarray(vetores, dtype=np.float32)
+    normas = np.linalg.norm(vetores, axis=-1, keepdims=True)
+    normas[normas == 0] = 1
+    return vetores / normas
+
+
+def _limpar_geracoes(manter):
+    manter = {os.path.realpath(pasta) for pasta in manter}
+    for nome in os.listdir(PASTA_GERACOES_VAGAS):
+        caminho = os.path.join(PASTA_GERACOES_VAGAS, nome)
+        if not nome.startswith(".tmp_") and os.path.realpath(caminho) not in manter:
+            shutil.rmtree(caminho, ignore_errors=True)
+
+
+def salvar_artefato_vagas(job_ids, job_titles, job_embeddings, retreinar_ivf=False, jobs=None):
+    """Grava embeddings normalizados, a versão int8, o IVF, o meta e `jobs` (vagas.pkl;
+    sem ele, o da geração atual é copiado) numa geração nova e a publica"""
+    anterior = pasta_artefato_vagas()
+    os.makedirs(PASTA_GERACOES_VAGAS, exist_ok=True)
+    embeddings = normalizar(job_embeddings)
+    codigos, escalas = quantizar_int8(embeddings)
+
+    pasta_tmp = tempfile.mkdtemp(prefix=".tmp_", dir=PASTA_GERACOES_VAGAS)
+    try:
+        np.save(os.path.join(pasta_tmp, NOME_EMBEDDINGS), embeddings)
+        np.save(os.path.join(pasta_tmp, NOME_CODIGOS_INT8), codigos)
+        np.save(os.path.join(pasta_tmp, NOME_ESCALAS_INT8), escalas)
+        salvar_indice_ivf(embeddings, pasta_tmp, None if retreinar_ivf else anterior)
+        if jobs is not None:
+            with open(os.path.join(pasta_tmp, NOME_VAGAS_PKL), "wb") as f:
+                pickle.dump(jobs, f)
+        elif os.path.exists(os.path.join(anterior, NOME_VAGAS_PKL)):
+            shutil.copyfile(os.path.join(anterior, NOME_VAGAS_PKL), os.path.join(pasta_tmp, NOME_VAGAS_PKL))
+        with open(os.path.join(pasta_tmp, NOME_META), "w", encoding="utf-8") as f:
+            json.dump({"n": len(job_ids), "versao_preprocessamento": VERSAO_PREPROCESSAMENTO,
+                       "job_ids": list(job_ids), "job_titles": list(job_titles)}, f, ensure_ascii=False)
+        geracao = os.path.join(PASTA_GERACOES_VAGAS, f"{time.time_ns()}-{os.getpid()}")
+        os.rename(pasta_tmp, geracao)
+    finally:
+        shutil.rmtree(pasta_tmp, ignore_errors=True)
+
+    trocar_link(ARTEFATO_VAGAS_ATUAL, os.path.relpath(geracao, PASTA_MODELO))
+    if anterior == PASTA_MODELO:
+        # Arquivos soltos de antes das gerações: a partir daqui ninguém os lê
+        for nome in (NOME_EMBEDDINGS, NOME_META, NOME_CODIGOS_INT8, NOME_ESCALAS_INT8,
+                     NOME_VAGAS_PKL, NOME_INDICE_IVF):
+            if os.path.exists(os.path.join(PASTA_MODELO, nome)):
+                os.remove(os.path.join(PASTA_MODELO, nome))
+    # A geração anterior fica para processos que ainda estejam carregando dela
+    _limpar_geracoes([geracao, anterior])
+
+
+def carregar_vagas_pkl(pasta=None):
+    """Dicionário completo das vagas (vagas.pkl) da geração em `pasta` (padrão: a publicada)"""
+    with open(os.path.join(pasta or pasta_artefato_vagas(), NOME_VAGAS_PKL), "rb") as f:
+        return pickle.load(f)
+
+
+def carregar_artefato_vagas(mmap=True):
+    """Dicionário no formato do antigo job_data.pkl, mais a pasta da geração lida (para
+    carregar os índices e o vagas.pkl da mesma geração), ou None se o artefato não existir"""
+    pasta = pasta_artefato_vagas()
+    caminho_embeddings = os.path.join(pasta, NOME_EMBEDDINGS)
+    caminho_meta = os.path.join(pasta, NOME_META)
+    if not (os.path.exists(caminho_embeddings) and os.path.exists(caminho_meta)):
+        return None
+
+    with open(caminho_meta, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    embeddings = np.load(caminho_embeddings, mmap_mode="r" if mmap else None)
+    if embeddings.shape[0] != meta["n"]:
+        raise ValueError("job_embeddings.npy e job_meta.json estão dessincronizados.")
+
+    return {"job_ids": meta["job_ids"], "job_titles": meta["job_titles"],
+            "job_embeddings": embeddings,
+            "versao_preprocessamento": meta.get("versao_preprocessamento"),
+            "pasta": pasta}
+
+
+def carregar_indice_int8(pasta, n_esperado, tamanho_shortlist=1000):
+    """Índice int8 em mmap da geração em `pasta`, ou None se ausente ou de outra versão do catálogo"""
+    caminho_codigos = os.path.join(pasta, NOME_CODIGOS_INT8)
+    caminho_escalas = os.path.join(pasta, NOME_ESCALAS_INT8)
+    if not (os.path.exists(caminho_codigos) and os.path.exists(caminho_escalas)):
+        return None
+
+    codigos = np.load(caminho_codigos, mmap_mode="r")
+    escalas = np.load(caminho_escalas)
+    if len(codigos) != n_esperado or len(escalas) != n_esperado:
+        return None
+    return IndiceInt8(codigos, escalas, tamanho_shortlist)
@@ -0,0 +1,145 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from aplicacao.utils.snapshot_dados import impressao_digital
+
+CAMINHO_APPLICANTS = 'aplicacao/dados/applicants.json'
+CAMINHO_BASE_CANDIDATOS = 'aplicacao/dados/applicants.sqlite'
+# Janela de mmap do SQLite: as páginas lidas ficam no cache do SO, compartilhadas entre processos
+MMAP_BYTES = 1 << 30
+# Limite de parâmetros por consulta do SQLite
+LOTE_CONSULTA = 900
+
+
+def _identidade_dados(caminho_json):
+    """sha256 do dados.zip de onde veio o applicants.json extraído (None para outro arquivo
+    ou sem registro da extração). Diferente do mtime, não muda quando o mesmo zip é
+    extraído de novo ou a base é gerada em outra máquina"""
+    if os.path.abspath(caminho_json) != os.path.abspath(CAMINHO_APPLICANTS):
+        return None
+    # Import tardio: carregar_dados importa este módulo
+    from aplicacao.utils.carregar_dados import identidade_fontes
+    return identidade_fontes()
+
+
+def construir_base_candidatos(caminho_json=CAMINHO_APPLICANTS, caminho_base=CAMINHO_BASE_CANDIDATOS):
+    """Gera, uma única vez, a base SQLite de candidatos chaveada pelo código do applicants.json"""
+    identidade = _identidade_dados(caminho_json)
+    inicio = time.perf_counter()
+    with open(caminho_json, 'r', encoding='utf-8') as f:
+        applicants = json.load(f)
+
+    pasta = os.path.dirname(caminho_base) or '.'
+    fd, tmp = tempfile.mkstemp(dir=pasta, suffix='.tmp')
+    os.close(fd)
+    con = sqlite3.connect(tmp)
+    try:
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        con.execute(
+            "CREATE TABLE candidatos (codigo TEXT PRIMARY KEY, dados TEXT NOT NULL) WITHOUT ROWID")
+        con.execute("CREATE TABLE meta (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+        con.executemany(
+            "INSERT INTO candidatos VALUES (?, ?)",
+            ((str(codigo), json.dumps(dados, ensure_ascii=False))
+             for codigo, dados in applicants.items()))
+        con.execute("INSERT INTO meta VALUES ('fontes', ?)",
+                    (json.dumps(impressao_digital([caminho_json])),))
+        if identidade:
+            con.execute("INSERT INTO meta VALUES ('identidade', ?)", (identidade,))
+        con.commit()
+    finally:
+        con.close()
+    os.replace(tmp, caminho_base)
+    print(f"Base de {len(applicants)} candidatos gerada em {time.perf_counter() - inicio:.1f}s.")
+
+
+class BaseCandidatos:
+    """Consulta de candidatos por código sem carregar o applicants.json em memória"""
+
+    def __init__(self, caminho_base=CAMINHO_BASE_CANDIDATOS):
+        self.caminho_base = caminho_base
+        # Uma conexão somente-leitura por thread (cada sessão do Streamlit roda em uma)
+        self._local = threading.local()
+
+    def _conexao(self):
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(f"file:{self.caminho_base}?mode=ro", uri=True)
+            con.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")
+            self._local.con = con
+        return con
+
+    def _meta(self, chave):
+        linha = self._conexao().execute(
+            "SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+    def fontes(self):
+        fontes = self._meta('fontes')
+        return json.loads(fontes) if fontes else None
+
+    def identidade(self):
+        """sha256 do dados.zip de onde a base foi gerada, se registrado"""
+        return self._meta('identidade')
+
+    def obter(self, codigo):
+        linha = self._conexao().execute(
+            "SELECT dados FROM candidatos WHERE codigo = ?", (str(codigo),)).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def obter_varios(self, codigos):
+        codigos = [str(c) for c in codigos]
+        resultado = {}
+        for i in range(0, len(codigos), LOTE_CONSULTA):
+            lote = codigos[i:i + LOTE_CONSULTA]
+            marcadores = ','.join('?' * len(lote))
+            for codigo, dados in self._conexao().execute(
+                    f"SELECT codigo, dados FROM candidatos WHERE codigo IN ({marcadores})", lote):
+                resultado[codigo] = json.loads(dados)
+        return resultado
+
+    def pagina(self, inicio=0, limite=50):
+        """Candidatos em ordem de código, uma página por vez"""
+        return [(codigo, json.loads(dados)) for codigo, dados in self._conexao().execute(
+            "SELECT codigo, dados FROM candidatos ORDER BY codigo LIMIT ? OFFSET ?",
+            (limite, inicio))]
+
+    def codigos(self):
+        for (codigo,) in self._conexao().execute("SELECT codigo FROM candidatos"):
+            yield codigo
+
+    def __contains__(self, codigo):
+        return self._conexao().execute(
+            "SELECT 1 FROM candidatos WHERE codigo = ?", (str(codigo),)).fetchone() is not None
+
+    def __len__(self):
+        return self._conexao().execute("SELECT COUNT(*) FROM candidatos").fetchone()[0]
+
+
+def abrir_base_candidatos(caminho_json=CAMINHO_APPLICANTS, caminho_base=CAMINHO_BASE_CANDIDATOS,
+                          construir_se_preciso=False):
+    """Abre a base se ela corresponder ao applicants.json atual; opcionalmente a (re)constrói"""
+    atual = os.path.exists(caminho_base)
+    if atual and os.path.exists(caminho_json):
+        base = BaseCandidatos(caminho_base)
+        identidade, registrada = _identidade_dados(caminho_json), base.identidade()
+        if identidade and registrada:
+            atual = registrada == identidade
+        else:
+            # Sem o hash do zip, vale o tamanho e o mtime do JSON
+            atual = base.fontes() == impressao_digital([caminho_json])
+
+    if not atual:
+        if not (construir_se_preciso and os.path.exists(caminho_json)):
+            return None
+        construir_base_candidatos(caminho_json, caminho_base)
+    return BaseCandidatos(caminho_base)
+
+
+if __name__ == "__main__":
+    construir_base_candidatos()
@@ -0,0 +1,133 @@
+"""Cache em dois níveis dos currículos enviados na página 1: texto extraído do PDF,
+embedding e recomendações, chaveados pelo hash do PDF (mais a versão do modelo,
+top_n etc.).
+
+O primeiro nível é um LRU em memória do processo; o segundo é um SQLite limitado
+em número de entradas, compartilhado entre os processos do servidor.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CAMINHO_CACHE_CV = "aplicacao/modelo/cache_cv.sqlite"
+TIPOS_CACHE = ("texto", "embedding", "resultado")
+
+
+def hash_conteudo(conteudo):
+    """sha256 dos bytes do arquivo enviado"""
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def montar_chave(tipo, *partes):
+    """Chave estável a partir de partes serializáveis em JSON (dicionários em qualquer ordem)"""
+    serializado = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{tipo}:{hashlib.sha1(serializado.encode('utf-8')).hexdigest()}"
+
+
+class CacheLRU:
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave, padrao=None):
+        with self._trava:
+            if chave not in self._itens:
+                return padrao
+            self._itens.move_to_end(chave)
+            return self._itens[chave]
+
+    def guardar(self, chave, valor):
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+
+    def __len__(self):
+        return len(self._itens)
+
+
+class CacheCV:
+    def __init__(self, capacidade_memoria=128, capacidade_disco=2000, caminho=CAMINHO_CACHE_CV):
+        self.memoria = CacheLRU(capacidade_memoria)
+        self.capacidade_disco = capacidade_disco
+        self.caminho = caminho
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self.contadores = {tipo: {"memoria": 0, "disco": 0, "faltas": 0} for tipo in TIPOS_CACHE}
+
+    def _conexao(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+            con = sqlite3.connect(self.caminho, timeout=30)
+            # WAL: leitores de outros processos não bloqueiam quem grava
+            con.execute("PRAGMA journal_mode = WAL")
+            con.execute("PRAGMA synchronous = NORMAL")
+            con.execute("CREATE TABLE IF NOT EXISTS cache_cv "
+                        "(chave TEXT PRIMARY KEY, valor BLOB NOT NULL, acesso REAL NOT NULL) WITHOUT ROWID")
+            con.execute("CREATE INDEX IF NOT EXISTS cache_cv_acesso ON cache_cv (acesso)")
+            self._local.con = con
+        return con
+
+    def _contar(self, tipo, nivel):
+        with self._trava:
+            self.contadores[tipo][nivel] += 1
+
+    def _ler_disco(self, chave):
+        try:
+            con = self._conexao()
+            linha = con.execute("SELECT valor FROM cache_cv WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                return None
+            with con:
+                con.execute("UPDATE cache_cv SET acesso = ? WHERE chave = ?", (time.time(), chave))
+            return pickle.loads(linha[0])
+        except sqlite3.Error:
+            # Cache em disco indisponível (p.ex. pasta somente-leitura): segue só com a memória
+            return None
+
+    def _gravar_disco(self, chave, valor):
+        try:
+            con = self._conexao()
+            with con:
+                con.execute("INSERT OR REPLACE INTO cache_cv VALUES (?, ?, ?)",
+                            (chave, pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL), time.time()))
+                excesso = con.execute("SELECT COUNT(*) FROM cache_cv").fetchone()[0] - self.capacidade_disco
+                if excesso > 0:
+                    con.execute("DELETE FROM cache_cv WHERE chave IN "
+                                "(SELECT chave FROM cache_cv ORDER BY acesso LIMIT ?)", (excesso,))
+        except sqlite3.Error:
+            pass
+
+    def obter_ou_calcular(self, tipo, chave, calcular, guardar=None):
+        """Valor da memória, do disco ou de `calcular()`, guardando nos níveis que faltavam
+        (um valor calculado só é guardado se `guardar(valor)`, quando informado)"""
+        valor = self.memoria.obter(chave)
+        if valor is not None:
+            self._contar(tipo, "memoria")
+            return valor
+
+        valor = self._ler_disco(chave)
+        if valor is not None:
+            self._contar(tipo, "disco")
+            self.memoria.guardar(chave, valor)
+            return valor
+
+        self._contar(tipo, "faltas")
+        valor = calcular()
+        if guardar is None or guardar(valor):
+            self.memoria.guardar(chave, valor)
+            self._gravar_disco(chave, valor)
+        return valor
+
+    def estatisticas(self):
+        """Acertos em memória, acertos em disco e faltas por tipo, desde o início do processo"""
+        with self._trava:
+            return {tipo: dict(contagem) for tipo, contagem in self.contadores.items()}
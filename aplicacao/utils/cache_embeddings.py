@@ -0,0 +1,80 @@
+import hashlib
+import os
+import tempfile
+import time
+
+import numpy as np
+
+CAMINHO_CACHE_EMBEDDINGS = "aplicacao/modelo/cache_embeddings.npz"
+
+
+class CacheEmbeddings:
+    """Cache persistente de embeddings por hash de (texto pré-processado, modelo, versão do pré-processamento)"""
+
+    def __init__(self, nome_modelo, versao_preprocessamento, caminho=CAMINHO_CACHE_EMBEDDINGS):
+        self.nome_modelo = nome_modelo
+        self.versao_preprocessamento = versao_preprocessamento
+        self.caminho = caminho
+        self.acertos = 0
+        self.faltas = 0
+        self.segundos_codificando = 0.0
+        self._vetores = {}
+        self._segundos_por_texto = None
+        self._usadas = set()
+
+        if os.path.exists(caminho):
+            with np.load(caminho, allow_pickle=False) as dados:
+                self._vetores = dict(zip(dados["chaves"].tolist(), dados["vetores"]))
+                if dados["segundos_por_texto"].size:
+                    self._segundos_por_texto = float(dados["segundos_por_texto"][0])
+
+    def chave(self, texto):
+        conteudo = "\0".join([self.nome_modelo, str(self.versao_preprocessamento), texto])
+        return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+    def codificar(self, textos, encode):
+        """Embeddings de `textos`, chamando `encode` apenas para os que não estão no cache"""
+        chaves = [self.chave(t) for t in textos]
+        faltantes = {}
+        for chave, texto in zip(chaves, textos):
+            if chave not in self._vetores:
+                faltantes.setdefault(chave, texto)
+
+        if faltantes:
+            inicio = time.perf_counter()
+            vetores = np.asarray(encode(list(faltantes.values())), dtype=np.float32)
+            self.segundos_codificando += time.perf_counter() - inicio
+            self._segundos_por_texto = self.segundos_codificando / len(faltantes)
+            self._vetores.update(zip(faltantes, vetores))
+
+        self.faltas += len(faltantes)
+        self.acertos += len(textos) - len(faltantes)
+        self._usadas.update(chaves)
+        if not chaves:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([self._vetores[c] for c in chaves])
+
+    def segundos_economizados(self):
+        if self._segundos_por_texto is None:
+            return 0.0
+        return self.acertos * self._segundos_por_texto
+
+    def relatorio(self):
+        print(f"Cache de embeddings: {self.acertos} acertos, {self.faltas} faltas; "
+              f"codificação em {self.segundos_codificando:.1f}s, "
+              f"~{self.segundos_economizados():.1f}s economizados.")
+
+    def salvar(self, podar=False):
+        """Grava o cache; com `podar`, mantém só as entradas usadas nesta execução"""
+        chaves = [c for c in self._vetores if not podar or c in self._usadas]
+        vetores = (np.stack([self._vetores[c] for c in chaves]) if chaves
+                   else np.empty((0, 0), dtype=np.float32))
+        segundos = [] if self._segundos_por_texto is None else [self._segundos_por_texto]
+
+        pasta = os.path.dirname(self.caminho) or "."
+        os.makedirs(pasta, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=pasta, suffix=".npz")
+        os.close(fd)
+        np.savez(tmp, chaves=np.array(chaves, dtype="U40"), vetores=vetores,
+                 segundos_por_texto=np.array(segundos, dtype=np.float64))
+        os.replace(tmp, self.caminho)
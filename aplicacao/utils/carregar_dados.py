@@ -2,32 +2,253 @@ import pandas as pd
 import json
 import os
 import shutil
+import hashlib
+import tempfile
+import threading
 import zipfile
+from collections import Counter
+from collections.abc import Mapping
+from aplicacao.utils.base_candidatos import abrir_base_candidatos
+from aplicacao.utils.snapshot_dados import (
+    carregar_snapshot, impressao_digital, salvar_snapshot, tipar_colunas)
+
+CAMINHO_ZIP = 'aplicacao/dados.zip'
+PASTA_DADOS = 'aplicacao/dados'
+# Cada versão do zip é extraída na sua própria pasta, nomeada pelo hash
+PASTA_EXTRACOES = os.path.join(PASTA_DADOS, '.extracoes')
+# Link para a extração em uso. Os arquivos de PASTA_DADOS são links fixos através
+# dele, então trocá-lo troca todos os arquivos de uma vez
+EXTRACAO_ATUAL = os.path.join(PASTA_DADOS, '.extracao_atual')
+# Registro do zip que originou os arquivos extraídos (dentro da extração)
+NOME_MARCADOR = '.extracao_zip.json'
+MARCADOR_EXTRACAO = os.path.join(EXTRACAO_ATUAL, NOME_MARCADOR)
+# Marcador de quando os arquivos eram extraídos direto em PASTA_DADOS
+MARCADOR_LEGADO = os.path.join(PASTA_DADOS, NOME_MARCADOR)
+
+
+def _hash_arquivo(caminho, bloco=1 << 20):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for parte in iter(lambda: f.read(bloco), b''):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def _ler_marcador(caminho=MARCADOR_EXTRACAO):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _arquivos_conferem(marcador):
+    # Os arquivos extraídos precisam existir com o tamanho registrado
+    for nome, tamanho in marcador.get('arquivos', {}).items():
+        caminho = os.path.join(PASTA_DADOS, nome)
+        if not os.path.isfile(caminho) or os.path.getsize(caminho) != tamanho:
+            return False
+    return bool(marcador.get('arquivos'))
+
+
+def _gravar_marcador(marcador, pasta=EXTRACAO_ATUAL):
+    fd, tmp = tempfile.mkstemp(dir=pasta, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(marcador, f)
+    os.replace(tmp, os.path.join(pasta, NOME_MARCADOR))
+
+
+def trocar_link(link, alvo):
+    """Aponta `link` para `alvo` com um único rename, atômico para quem lê"""
+    tmp = f'{link}.{os.getpid()}.{threading.get_ident()}.tmp'
+    os.symlink(alvo, tmp)
+    os.replace(tmp, link)
+
+
+def _extrair_zip(destino):
+    """Extrai os arquivos do zip, sem as pastas, em `destino`; devolve {nome: tamanho}"""
+    with zipfile.ZipFile(CAMINHO_ZIP, 'r') as zip_ref:
+        membros = [m for m in zip_ref.infolist() if not m.is_dir()]
+        contagem = Counter(os.path.basename(m.filename) for m in membros)
+        repetidos = sorted(nome for nome, n in contagem.items() if n > 1)
+        if repetidos:
+            raise ValueError(f"{CAMINHO_ZIP} tem arquivos de mesmo nome em pastas diferentes: "
+                             f"{', '.join(repetidos)}")
+
+        arquivos = {}
+        for membro in membros:
+            nome = os.path.basename(membro.filename)
+            with zip_ref.open(membro) as origem, \
+                    open(os.path.join(destino, nome), 'wb') as saida:
+                shutil.copyfileobj(origem, saida, 1 << 20)
+            arquivos[nome] = membro.file_size
+    return arquivos
+
+
+def _limpar_extracoes(manter):
+    """Apaga as extrações publicadas que não estão em `manter`"""
+    manter = {os.path.realpath(pasta) for pasta in manter}
+    for nome in os.listdir(PASTA_EXTRACOES):
+        caminho = os.path.join(PASTA_EXTRACOES, nome)
+        if not nome.startswith('.tmp_') and os.path.realpath(caminho) not in manter:
+            shutil.rmtree(caminho, ignore_errors=True)
+
 
 def garantir_dados_extraidos():
-    caminho_zip = 'aplicacao/dados.zip'
-    pasta_destino = 'aplicacao/dados'
+    """Extrai o dados.zip apenas quando o conteúdo extraído não corresponde ao zip atual"""
+    if not os.path.exists(CAMINHO_ZIP):
+        for caminho in (MARCADOR_EXTRACAO, MARCADOR_LEGADO):
+            marcador = _ler_marcador(caminho)
+            if marcador and _arquivos_conferem(marcador):
+                return
+        raise FileNotFoundError(f"Arquivo {CAMINHO_ZIP} não encontrado.")
+
+    stat = os.stat(CAMINHO_ZIP)
+    marcador = _ler_marcador()
 
-    if os.path.exists(pasta_destino):
-        shutil.rmtree(pasta_destino)
+    # Caminho rápido: mesmo tamanho e mtime do zip já extraído, sem recalcular o hash
+    if (marcador and marcador.get('tamanho') == stat.st_size
+            and marcador.get('mtime_ns') == stat.st_mtime_ns
+            and _arquivos_conferem(marcador)):
+        return
 
-    with zipfile.ZipFile(caminho_zip, 'r') as zip_ref:
-        zip_ref.extractall('aplicacao')
+    sha256 = _hash_arquivo(CAMINHO_ZIP)
+    if (marcador and marcador.get('sha256') == sha256
+            and marcador.get('tamanho') == stat.st_size
+            and _arquivos_conferem(marcador)):
+        marcador['mtime_ns'] = stat.st_mtime_ns
+        _gravar_marcador(marcador)
+        return
+
+    os.makedirs(PASTA_EXTRACOES, exist_ok=True)
+    pasta_versao = os.path.join(PASTA_EXTRACOES, sha256[:16])
+    if not os.path.isdir(pasta_versao):
+        # Extrai numa pasta temporária e só a publica, com um rename, quando completa
+        pasta_tmp = tempfile.mkdtemp(prefix='.tmp_', dir=PASTA_EXTRACOES)
+        try:
+            arquivos = _extrair_zip(pasta_tmp)
+            _gravar_marcador({
+                'sha256': sha256,
+                'tamanho': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'arquivos': arquivos,
+            }, pasta_tmp)
+            try:
+                os.rename(pasta_tmp, pasta_versao)
+            except OSError:
+                # Outra sessão publicou a mesma versão primeiro
+                if not os.path.isdir(pasta_versao):
+                    raise
+        finally:
+            shutil.rmtree(pasta_tmp, ignore_errors=True)
+    else:
+        with open(os.path.join(pasta_versao, NOME_MARCADOR), 'r', encoding='utf-8') as f:
+            arquivos = json.load(f)['arquivos']
+
+    anterior = os.path.realpath(EXTRACAO_ATUAL) if os.path.islink(EXTRACAO_ATUAL) else None
+    trocar_link(EXTRACAO_ATUAL, os.path.relpath(pasta_versao, PASTA_DADOS))
+    # Links fixos (vagas.json -> .extracao_atual/vagas.json), criados só na primeira vez
+    for nome in arquivos:
+        link = os.path.join(PASTA_DADOS, nome)
+        alvo = os.path.join(os.path.basename(EXTRACAO_ATUAL), nome)
+        if not (os.path.islink(link) and os.readlink(link) == alvo):
+            trocar_link(link, alvo)
+    if os.path.exists(MARCADOR_LEGADO):
+        os.remove(MARCADOR_LEGADO)
+    # A extração anterior fica para leitores que ainda estejam com o caminho antigo
+    _limpar_extracoes([pasta_versao] + ([anterior] if anterior else []))
     print("Arquivos de dados extraídos com sucesso.")
 
 
-def carregar_base():
-    # Garante que os arquivos JSON estejam disponíveis
-    garantir_dados_extraidos()
+def identidade_fontes(direto_do_zip=False):
+    """sha256 do dados.zip que originou os JSONs em uso (None se não houver registro)"""
+    if direto_do_zip:
+        return _hash_arquivo(CAMINHO_ZIP)
+    marcador = _ler_marcador() or _ler_marcador(MARCADOR_LEGADO)
+    return marcador.get('sha256') if marcador else None
+
+
+def ler_json_dados(nome, direto_do_zip=False):
+    """Lê um dos JSONs da base, do disco ou diretamente do dados.zip"""
+    if not direto_do_zip:
+        with open(os.path.join(PASTA_DADOS, nome), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    with zipfile.ZipFile(CAMINHO_ZIP, 'r') as zip_ref:
+        membro = next(m for m in zip_ref.namelist() if os.path.basename(m) == nome)
+        with zip_ref.open(membro) as f:
+            return json.load(f)
 
-    path_vagas = 'aplicacao/dados/vagas.json'
-    path_prospects = 'aplicacao/dados/prospects.json'
-    path_applicants = 'aplicacao/dados/applicants.json'
 
-    # --- VAGAS ---
-    with open(path_vagas, "r", encoding="utf-8") as f:
-        vagas_json = json.load(f)
+class JsonSobDemanda(Mapping):
+    """Dicionário de um dos JSONs da base que só faz o parse no primeiro acesso"""
 
+    def __init__(self, nome, direto_do_zip=False, dados=None):
+        self._nome = nome
+        self._direto_do_zip = direto_do_zip
+        self._dados = dados
+        self._lock = threading.Lock()
+
+    @property
+    def carregado(self):
+        return self._dados is not None
+
+    def _carregar(self):
+        if self._dados is None:
+            with self._lock:
+                if self._dados is None:
+                    self._dados = ler_json_dados(self._nome, self._direto_do_zip)
+        return self._dados
+
+    def __getitem__(self, chave):
+        return self._carregar()[chave]
+
+    def __contains__(self, chave):
+        return chave in self._carregar()
+
+    def __iter__(self):
+        return iter(self._carregar())
+
+    def __len__(self):
+        return len(self._carregar())
+
+
+class CandidatosSobDemanda(JsonSobDemanda):
+    """Dicionário de applicants.json que só faz o parse no primeiro acesso.
+
+    Se a base indexada (base_candidatos) estiver atualizada, as consultas vão
+    direto a ela e o JSON nunca é carregado.
+    """
+
+    def __init__(self, direto_do_zip=False):
+        super().__init__('applicants.json', direto_do_zip)
+        self._base = None if direto_do_zip else abrir_base_candidatos()
+
+    def __getitem__(self, codigo):
+        if self._base is not None:
+            dados = self._base.obter(codigo)
+            if dados is None:
+                raise KeyError(codigo)
+            return dados
+        return super().__getitem__(codigo)
+
+    def __contains__(self, codigo):
+        if self._base is not None:
+            return codigo in self._base
+        return super().__contains__(codigo)
+
+    def __iter__(self):
+        if self._base is not None:
+            return self._base.codigos()
+        return super().__iter__()
+
+    def __len__(self):
+        if self._base is not None:
+            return len(self._base)
+        return super().__len__()
+
+
+def montar_vagas_df(vagas_json):
     vagas_list = []
     for job_id, job_data in vagas_json.items():
         flat_data = {"job_id": str(job_id)}
@@ -42,11 +263,10 @@ def carregar_base():
 
     vagas_df = pd.DataFrame(vagas_list)
     vagas_df.columns = [col.replace(" ", "_") for col in vagas_df.columns]
+    return vagas_df
 
-    # --- PROSPECTS ---
-    with open(path_prospects, "r", encoding="utf-8") as f:
-        prospects_json = json.load(f)
 
+def montar_prospects_df(prospects_json):
     prospects_list = []
     for job_id, job_data in prospects_json.items():
         if "prospects" in job_data:
@@ -54,14 +274,61 @@ def carregar_base():
                 candidate["job_id"] = str(job_id)
                 prospects_list.append(candidate)
 
-    prospects_df = pd.DataFrame(prospects_list)
+    return pd.DataFrame(prospects_list)
+
+
+def montar_titulos_vagas(prospects_json):
+    """Título e modalidade de cada vaga de prospects.json, o que o painel de candidatos usa dele"""
+    return pd.DataFrame(
+        [{"job_id": str(job_id), "titulo": vaga.get("titulo", ""), "modalidade": vaga.get("modalidade", "")}
+         for job_id, vaga in prospects_json.items()],
+        columns=["job_id", "titulo", "modalidade"])
+
+
+def impressao_digital_fontes(direto_do_zip=False):
+    """Identifica a versão dos JSONs que originam o snapshot"""
+    if direto_do_zip:
+        return impressao_digital([CAMINHO_ZIP])
+    return impressao_digital([
+        os.path.join(PASTA_DADOS, 'vagas.json'),
+        os.path.join(PASTA_DADOS, 'prospects.json'),
+    ])
+
+
+def carregar_base(direto_do_zip=False):
+    # Garante que os arquivos JSON estejam disponíveis
+    if not direto_do_zip:
+        garantir_dados_extraidos()
+    digital = impressao_digital_fontes(direto_do_zip)
+
+    # --- VAGAS / PROSPECTS (snapshot colunar, refeito só quando os JSONs mudam) ---
+    # Com o snapshot válido, prospects.json só é lido se alguém acessar prospects_json
+    frames = carregar_snapshot(['vagas', 'prospects', 'titulos_vagas'], digital)
+    if frames is None:
+        prospects_json = ler_json_dados('prospects.json', direto_do_zip)
+        vagas_json = ler_json_dados('vagas.json', direto_do_zip)
+        frames = {
+            'vagas': tipar_colunas(montar_vagas_df(vagas_json)),
+            'prospects': tipar_colunas(montar_prospects_df(prospects_json)),
+            'titulos_vagas': montar_titulos_vagas(prospects_json),
+        }
+        # Deltas ingeridos sobre esta mesma exportação não estão nos JSONs: voltam a
+        # ser aplicados ao snapshot novo
+        from aplicacao.utils.ingestao_incremental import reaplicar_deltas_registrados
+        frames, versoes = reaplicar_deltas_registrados(frames, identidade_fontes(direto_do_zip))
+        salvar_snapshot(frames, digital, versoes)
+    else:
+        prospects_json = None
+    prospects_json = JsonSobDemanda('prospects.json', direto_do_zip, prospects_json)
+    vagas_df, prospects_df = frames['vagas'], frames['prospects']
+    titulos_vagas_df = frames['titulos_vagas']
 
     # --- APPLICANTS ---
-    with open(path_applicants, "r", encoding="utf-8") as f:
-        applicants_json = json.load(f)
+    # O maior arquivo (CVs completos) só é lido quando alguma página pede candidatos
+    applicants_json = CandidatosSobDemanda(direto_do_zip)
 
     # Apenas retorna o JSON, o DataFrame não é mais necessário se não for usado
     applicants_df = pd.DataFrame()  # Placeholder vazio, se não utilizado
 
     #  Retorno completo e compatível com `preparar_candidatos_df()`
-    return vagas_df, prospects_df, applicants_df, prospects_json, applicants_json
\ No newline at end of file
+    return vagas_df, prospects_df, applicants_df, prospects_json, applicants_json, titulos_vagas_df
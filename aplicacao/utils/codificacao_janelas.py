@@ -0,0 +1,79 @@
+"""Codificação de textos longos em janelas de tokens com pooling dos embeddings.
+
+O modelo de embeddings trunca a entrada em `max_seq_length` tokens, então um CV
+longo perde quase todo o conteúdo. Aqui cada texto é tokenizado uma única vez,
+os ids são cortados em janelas que cabem no modelo e todas as janelas de todos
+os textos passam pelo modelo juntas (ordenadas por tamanho, em lotes com pouco
+padding). Os embeddings das janelas de cada texto são então combinados.
+
+Texto que cabe em uma janela dá exatamente o mesmo vetor que `model.encode`.
+"""
+import numpy as np
+
+POOLINGS = ("media", "max", "ponderada")
+
+
+def janelas_de_tokens(ids, tamanho, sobreposicao=0, max_janelas=None):
+    """Cortes de `ids` em janelas de até `tamanho` tokens (ao menos uma, mesmo vazia)"""
+    passo = tamanho - sobreposicao
+    inicios = range(0, max(len(ids) - sobreposicao, 1), passo)
+    janelas = [ids[i:i + tamanho] for i in inicios]
+    return janelas[:max_janelas] if max_janelas else janelas
+
+
+def _preencher(sequencias, pad_id):
+    """input_ids e máscara de atenção com padding à direita até a maior sequência do lote"""
+    largura = max(len(sequencia) for sequencia in sequencias)
+    input_ids = np.full((len(sequencias), largura), pad_id, dtype=np.int64)
+    mascara = np.zeros((len(sequencias), largura), dtype=np.int64)
+    for linha, sequencia in enumerate(sequencias):
+        input_ids[linha, :len(sequencia)] = sequencia
+        mascara[linha, :len(sequencia)] = 1
+    return input_ids, mascara
+
+
+def _combinar(embeddings, inicios, tamanhos, pooling):
+    if pooling == "max":
+        return np.maximum.reduceat(embeddings, inicios, axis=0)
+    if pooling == "ponderada":
+        # Peso de cada janela = tokens reais que ela tem (a máscara de atenção)
+        pesos = np.asarray(tamanhos, dtype=np.float32)[:, None]
+        somas = np.add.reduceat(embeddings * pesos, inicios, axis=0)
+        return somas / np.maximum(np.add.reduceat(pesos, inicios, axis=0), 1)
+    contagens = np.diff(np.append(inicios, len(embeddings)))[:, None]
+    return np.add.reduceat(embeddings, inicios, axis=0) / contagens
+
+
+def codificar_em_janelas(model, textos, pooling="media", sobreposicao=0, max_janelas=None,
+                         tamanho_lote=64):
+    """Um embedding float32 por texto, combinando as janelas com `pooling` (POOLINGS)"""
+    import torch
+
+    if pooling not in POOLINGS:
+        raise ValueError(f"Pooling desconhecido: {pooling}. Use um de {POOLINGS}.")
+
+    tokenizer = model.tokenizer
+    tamanho = model.max_seq_length - tokenizer.num_special_tokens_to_add(pair=False)
+    ids_por_texto = tokenizer(list(textos), add_special_tokens=False, truncation=False,
+                              verbose=False)["input_ids"]
+
+    janelas, inicios = [], []
+    for ids in ids_por_texto:
+        inicios.append(len(janelas))
+        janelas.extend(janelas_de_tokens(ids, tamanho, sobreposicao, max_janelas))
+    tamanhos = [len(janela) for janela in janelas]
+
+    dimensao = model.get_sentence_embedding_dimension()
+    embeddings = np.empty((len(janelas), dimensao), dtype=np.float32)
+    ordem = np.argsort(tamanhos, kind="stable")
+    with torch.inference_mode():
+        for i in range(0, len(ordem), tamanho_lote):
+            lote = ordem[i:i + tamanho_lote]
+            input_ids, mascara = _preencher(
+                [tokenizer.build_inputs_with_special_tokens(janelas[j]) for j in lote],
+                tokenizer.pad_token_id)
+            features = {"input_ids": torch.from_numpy(input_ids).to(model.device),
+                        "attention_mask": torch.from_numpy(mascara).to(model.device)}
+            embeddings[lote] = model(features)["sentence_embedding"].float().cpu().numpy()
+
+    return _combinar(embeddings, np.asarray(inicios), tamanhos, pooling)
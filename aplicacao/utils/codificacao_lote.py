@@ -0,0 +1,126 @@
+"""Codificação em lote de corpora grandes (vagas, CVs de candidatos) com vários processos.
+
+Os textos são ordenados pelo número de tokens, então cada lote junta textos de
+tamanho parecido e quase não há padding. A lista ordenada é dividida em fatias
+distribuídas entre processos; cada fatia concluída é gravada direto em um .npy
+float32 pré-alocado (memmap) e registrada em um arquivo de progresso, o que
+permite retomar a codificação depois de uma falha sem refazer o que já foi feito.
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+
+_modelo_trabalhador = None
+
+
+def _iniciar_trabalhador(nome_modelo, backend, threads):
+    global _modelo_trabalhador
+    import torch
+    from aplicacao.utils.codificador import carregar_codificador
+
+    torch.set_num_threads(threads)
+    _modelo_trabalhador = carregar_codificador(nome_modelo, backend)
+
+
+def _codificar_fatia(indice_fatia, textos, tamanho_lote):
+    vetores = _modelo_trabalhador.encode(textos, batch_size=tamanho_lote)
+    return indice_fatia, np.asarray(vetores, dtype=np.float32)
+
+
+def _assinatura(textos, nome_modelo):
+    h = hashlib.sha1(nome_modelo.encode("utf-8"))
+    for texto in textos:
+        h.update(b"\0")
+        h.update(texto.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _ler_progresso(caminho):
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_progresso(caminho, progresso):
+    tmp = caminho + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(progresso, f)
+    os.replace(tmp, caminho)
+
+
+def ordenar_por_tokens(textos, tokenizer, max_tokens):
+    """Índices dos textos do menor para o maior número de tokens (após truncar)"""
+    tamanhos = [len(ids) for ids in tokenizer(
+        textos, add_special_tokens=True, truncation=True, max_length=max_tokens)["input_ids"]]
+    return np.argsort(tamanhos, kind="stable")
+
+
+def codificar_em_lote(textos, nome_modelo, caminho_saida, processos=None,
+                      tamanho_lote=64, tamanho_fatia=2048, backend="torch"):
+    """Codifica `textos` em `caminho_saida` (.npy float32, uma linha por texto, na ordem original).
+
+    Retorna o array aberto em modo memmap. Se a execução anterior para os mesmos
+    textos e modelo foi interrompida, só as fatias pendentes são codificadas.
+    """
+    from aplicacao.utils.codificador import carregar_codificador
+
+    if not textos:
+        return np.empty((0, 0), dtype=np.float32)
+
+    processos = processos or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // processos)
+    caminho_progresso = caminho_saida + ".progresso.json"
+    assinatura = _assinatura(textos, nome_modelo if backend == "torch" else f"{nome_modelo}:{backend}")
+
+    # Carregado aqui primeiro para a exportação ONNX, se necessária, não ser feita
+    # por vários trabalhadores ao mesmo tempo
+    modelo = carregar_codificador(nome_modelo, backend)
+    dimensao = modelo.get_sentence_embedding_dimension()
+    ordem = ordenar_por_tokens(textos, modelo.tokenizer, modelo.max_seq_length)
+    # O processo principal só precisava do tokenizer; os trabalhadores têm seus modelos
+    del modelo
+
+    fatias = [ordem[i:i + tamanho_fatia] for i in range(0, len(ordem), tamanho_fatia)]
+    progresso = _ler_progresso(caminho_progresso)
+    if (progresso and progresso.get("assinatura") == assinatura
+            and os.path.exists(caminho_saida)):
+        saida = np.load(caminho_saida, mmap_mode="r+")
+        concluidas = set(progresso["fatias_concluidas"])
+    else:
+        saida = np.lib.format.open_memmap(
+            caminho_saida, mode="w+", dtype=np.float32, shape=(len(textos), dimensao))
+        progresso = {"assinatura": assinatura, "fatias_concluidas": []}
+        concluidas = set()
+        _gravar_progresso(caminho_progresso, progresso)
+
+    pendentes = [i for i in range(len(fatias)) if i not in concluidas]
+    inicio = time.perf_counter()
+    if pendentes:
+        with ProcessPoolExecutor(
+                max_workers=min(processos, len(pendentes)),
+                mp_context=get_context("spawn"),
+                initializer=_iniciar_trabalhador,
+                initargs=(nome_modelo, backend, threads)) as executor:
+            futuros = [executor.submit(_codificar_fatia, i, [textos[j] for j in fatias[i]], tamanho_lote)
+                       for i in pendentes]
+            for futuro in as_completed(futuros):
+                indice_fatia, vetores = futuro.result()
+                saida[fatias[indice_fatia]] = vetores
+                saida.flush()
+                progresso["fatias_concluidas"].append(indice_fatia)
+                _gravar_progresso(caminho_progresso, progresso)
+
+    duracao = time.perf_counter() - inicio
+    codificados = sum(len(fatias[i]) for i in pendentes)
+    if codificados:
+        print(f"{codificados} textos codificados em {duracao:.1f}s "
+              f"({codificados / duracao:.0f} textos/s, {processos} processos).")
+    os.remove(caminho_progresso)
+    return saida
@@ -0,0 +1,70 @@
+"""Modelo de embeddings com o backend de inferência escolhido em configuracao.BACKEND_CODIFICADOR.
+
+- "torch": o SentenceTransformer em PyTorch float32, o mesmo do treino.
+- "torch_int8": o mesmo modelo com as camadas Linear quantizadas dinamicamente
+  para int8 (torch.ao.quantization); não precisa de nenhum pacote extra.
+- "onnx_int8": ONNX Runtime com o modelo exportado e quantizado dinamicamente para
+  int8 (requer `pip install optimum-onnx[onnxruntime]`). A exportação é feita uma
+  vez e fica em PASTA_MODELOS_ONNX.
+
+Todos devolvem um SentenceTransformer: `encode` e `codificar_em_janelas` (que chama
+o modelo com os input_ids já tokenizados) funcionam igual em qualquer backend. Os
+vetores mudam um pouco com a quantização, então o backend faz parte das versões
+dos caches de embeddings.
+"""
+import glob
+import os
+import platform
+
+from aplicacao.utils import configuracao
+
+BACKENDS = ("torch", "torch_int8", "onnx_int8")
+PASTA_MODELOS_ONNX = "aplicacao/modelo/onnx"
+
+
+def _configuracao_quantizacao_onnx():
+    """Configuração de quantização do ONNX Runtime para a CPU deste servidor"""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        flags = ""
+    # Com VNNI o produto int8 sai em uma instrução; avx2 roda em qualquer x86 recente
+    return "avx512_vnni" if "avx512_vnni" in flags else "avx2"
+
+
+def _carregar_onnx_int8(nome_modelo, device):
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+    quantizacao = _configuracao_quantizacao_onnx()
+    pasta = os.path.join(PASTA_MODELOS_ONNX, os.path.basename(os.path.normpath(nome_modelo)))
+    # O nome do arquivo depende da configuração (model_qint8_avx512_vnni.onnx, model_quint8_avx2.onnx)
+    padrao = os.path.join(pasta, "onnx", f"model_*int8_{quantizacao}.onnx")
+    if not glob.glob(padrao):
+        print(f"Exportando {nome_modelo} para ONNX int8 em {pasta}...")
+        model = SentenceTransformer(nome_modelo, device=device, backend="onnx")
+        model.save(pasta)
+        export_dynamic_quantized_onnx_model(model, quantizacao, pasta)
+    arquivo = os.path.relpath(glob.glob(padrao)[0], pasta)
+    return SentenceTransformer(pasta, device=device, backend="onnx",
+                               model_kwargs={"file_name": arquivo})
+
+
+def carregar_codificador(nome_modelo, backend=None, device="cpu"):
+    """SentenceTransformer de `nome_modelo` com o backend pedido (padrão: o da configuração)"""
+    backend = backend or configuracao.BACKEND_CODIFICADOR
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de codificação desconhecido: {backend}. Use um de {BACKENDS}.")
+    if backend == "onnx_int8":
+        return _carregar_onnx_int8(nome_modelo, device)
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(nome_modelo, device=device)
+    if backend == "torch_int8":
+        import torch
+        torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8,
+                                               inplace=True)
+    return model
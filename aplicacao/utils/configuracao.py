@@ -0,0 +1,49 @@
+"""Configurações do servidor, lidas de variáveis de ambiente"""
+import os
+
+# Busca das vagas: "exato" (varredura float32), "int8" (varredura quantizada
+# seguida de reordenação exata de uma lista curta) ou "ivf" (só as listas dos
+# centróides mais próximos; catálogos pequenos não têm IVF e usam a varredura exata)
+INDICE_VAGAS = os.environ.get("DECISION_INDICE_VAGAS", "exato")
+# Candidatas reavaliadas em float32 quando a busca é aproximada
+TAMANHO_SHORTLIST = int(os.environ.get("DECISION_TAMANHO_SHORTLIST", "1000"))
+# Listas do IVF visitadas por consulta: mais listas, mais recall e mais latência
+IVF_NPROBE = int(os.environ.get("DECISION_IVF_NPROBE", "16"))
+# Cache de currículos da página 1: entradas no LRU do processo e no SQLite compartilhado
+CACHE_CV_MEMORIA = int(os.environ.get("DECISION_CACHE_CV_MEMORIA", "128"))
+CACHE_CV_DISCO = int(os.environ.get("DECISION_CACHE_CV_DISCO", "2000"))
+# Orçamento da extração de PDFs: tamanho, páginas e segundos por arquivo; a leitura
+# para antes se já houver texto suficiente para o embedding
+PDF_MAX_BYTES = int(os.environ.get("DECISION_PDF_MAX_BYTES", str(20 * 2**20)))
+PDF_MAX_PAGINAS = int(os.environ.get("DECISION_PDF_MAX_PAGINAS", "50"))
+PDF_TEMPO_MAXIMO = float(os.environ.get("DECISION_PDF_TEMPO_MAXIMO", "10"))
+PDF_CARACTERES_SUFICIENTES = int(os.environ.get("DECISION_PDF_CARACTERES_SUFICIENTES", "50000"))
+# Processos da extração paralela (0 = até 4, conforme os núcleos)
+PDF_PROCESSOS = int(os.environ.get("DECISION_PDF_PROCESSOS", "0"))
+# Codificação dos CVs: "truncada" (só os primeiros tokens, como nos dados de treino do
+# ensemble) ou "janelas" (o CV inteiro em janelas de tokens combinadas por POOLING_JANELAS:
+# "media", "max" ou "ponderada"); MAX_JANELAS_CV limita o custo por CV
+CODIFICACAO_CV = os.environ.get("DECISION_CODIFICACAO_CV", "truncada")
+POOLING_JANELAS = os.environ.get("DECISION_POOLING_JANELAS", "media")
+MAX_JANELAS_CV = int(os.environ.get("DECISION_MAX_JANELAS_CV", "16"))
+# Backend do modelo de embeddings: "torch" (float32, como no treino), "torch_int8"
+# (Linear quantizadas dinamicamente) ou "onnx_int8" (ONNX Runtime, requer optimum-onnx)
+BACKEND_CODIFICADOR = os.environ.get("DECISION_BACKEND_CODIFICADOR", "torch")
+# Carregar e aquecer catálogo e modelo da página 1 em segundo plano quando o servidor sobe
+AQUECER_MODELOS = os.environ.get("DECISION_AQUECER_MODELOS", "1") != "0"
+# Executor de inferência da página 1: trabalhadores (0 = até 2, conforme os núcleos),
+# threads de torch/BLAS/xgboost por trabalhador (0 = núcleos / trabalhadores), CVs
+# aguardando na fila antes de recusar e segundos de espera antes de desistir
+INFERENCIA_TRABALHADORES = int(os.environ.get("DECISION_INFERENCIA_TRABALHADORES", "0"))
+INFERENCIA_THREADS = int(os.environ.get("DECISION_INFERENCIA_THREADS", "0"))
+INFERENCIA_FILA = int(os.environ.get("DECISION_INFERENCIA_FILA", "8"))
+INFERENCIA_ESPERA_MAXIMA = float(os.environ.get("DECISION_INFERENCIA_ESPERA_MAXIMA", "30"))
+# Lotes dinâmicos de codificação: até LOTE_MAXIMO CVs de sessões diferentes que chegam
+# em até LOTE_ESPERA_MS milissegundos passam juntos pelo modelo (1 = sem lotes)
+LOTE_MAXIMO = int(os.environ.get("DECISION_LOTE_MAXIMO", "16"))
+LOTE_ESPERA_MS = float(os.environ.get("DECISION_LOTE_ESPERA_MS", "2"))
+# Serviço de inferência compartilhado pelas réplicas (python -m aplicacao.utils.servico_inferencia):
+# "unix:/caminho/do/socket" ou "host:porta"; vazio = modelos no próprio processo. Se o
+# serviço não responder em SERVICO_INFERENCIA_TIMEOUT segundos, a página 1 usa o modelo local
+SERVICO_INFERENCIA = os.environ.get("DECISION_SERVICO_INFERENCIA", "")
+SERVICO_INFERENCIA_TIMEOUT = float(os.environ.get("DECISION_SERVICO_INFERENCIA_TIMEOUT", "60"))
@@ -0,0 +1,127 @@
+"""Executor das chamadas de inferência da página 1 (codificação do CV e pontuação).
+
+Cada sessão do Streamlit roda em uma thread própria; sem controle, vários CVs ao
+mesmo tempo chamam o modelo juntos e cada chamada do torch, do BLAS e do xgboost
+abre suas próprias threads, disputando os mesmos núcleos. Aqui as chamadas passam
+por um pool fixo de trabalhadores, cada biblioteca limitada a
+`threads_por_trabalhador`, com uma fila limitada: quando ela está cheia a chamada
+é recusada na hora (ServidorOcupado) em vez de esperar indefinidamente.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Quantas esperas e durações recentes entram nos percentis das métricas
+JANELA_METRICAS = 1000
+
+
+class ServidorOcupado(RuntimeError):
+    """A fila de inferência está cheia ou a espera passou do limite"""
+
+
+class ExecutorInferencia:
+    def __init__(self, trabalhadores=None, tamanho_fila=8, threads_por_trabalhador=None,
+                 espera_maxima=30.0):
+        nucleos = os.cpu_count() or 1
+        self.trabalhadores = trabalhadores or min(2, nucleos)
+        self.threads_por_trabalhador = threads_por_trabalhador or max(1, nucleos // self.trabalhadores)
+        self.tamanho_fila = tamanho_fila
+        self.espera_maxima = espera_maxima
+        self._pool = ThreadPoolExecutor(max_workers=self.trabalhadores,
+                                        thread_name_prefix="inferencia")
+        # Vagas = trabalhadores ocupados + chamadas na fila
+        self._vagas = threading.BoundedSemaphore(self.trabalhadores + tamanho_fila)
+        self._trava = threading.Lock()
+        self._local = threading.local()
+        self._aguardando = 0
+        self._executando = 0
+        self.contadores = {"aceitas": 0, "recusadas": 0, "expiradas": 0, "erros": 0}
+        self._esperas = deque(maxlen=JANELA_METRICAS)
+        self._duracoes = deque(maxlen=JANELA_METRICAS)
+
+    def _limitar_threads(self):
+        """Aplica o limite de threads às bibliotecas já carregadas, uma vez por trabalhador
+        (o limite do OpenMP vale por thread; o do torch e o do BLAS, para o processo)"""
+        limitadas = getattr(self._local, "limitadas", set())
+        pendentes = {"torch", "numpy", "xgboost"} & set(sys.modules) - limitadas
+        if not pendentes:
+            return
+        if "torch" in pendentes:
+            sys.modules["torch"].set_num_threads(self.threads_por_trabalhador)
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(limits=self.threads_por_trabalhador)
+        except ImportError:
+            pass
+        self._local.limitadas = limitadas | pendentes
+
+    def em_trabalhador(self):
+        """Se a thread atual é um dos trabalhadores"""
+        return getattr(self._local, "trabalhador", False)
+
+    def executar(self, funcao, *args, **kwargs):
+        """Resultado de `funcao(*args, **kwargs)` rodada em um trabalhador.
+
+        Levanta ServidorOcupado se a fila está cheia ou se a chamada não começou a
+        rodar em `espera_maxima` segundos. Chamada feita de dentro de um trabalhador
+        roda ali mesmo (esperar por outro trabalhador poderia travar o pool).
+        """
+        if self.em_trabalhador():
+            return funcao(*args, **kwargs)
+        if not self._vagas.acquire(blocking=False):
+            with self._trava:
+                self.contadores["recusadas"] += 1
+            raise ServidorOcupado("Fila de inferência cheia.")
+
+        enfileirada = time.perf_counter()
+        iniciou = threading.Event()
+
+        def tarefa():
+            inicio = time.perf_counter()
+            with self._trava:
+                self._aguardando -= 1
+                self._executando += 1
+                self._esperas.append(inicio - enfileirada)
+            iniciou.set()
+            self._local.trabalhador = True
+            try:
+                self._limitar_threads()
+                return funcao(*args, **kwargs)
+            except Exception:
+                with self._trava:
+                    self.contadores["erros"] += 1
+                raise
+            finally:
+                with self._trava:
+                    self._executando -= 1
+                    self._duracoes.append(time.perf_counter() - inicio)
+                self._vagas.release()
+
+        with self._trava:
+            self.contadores["aceitas"] += 1
+            self._aguardando += 1
+        futuro = self._pool.submit(tarefa)
+        if not iniciou.wait(self.espera_maxima) and futuro.cancel():
+            with self._trava:
+                self._aguardando -= 1
+                self.contadores["expiradas"] += 1
+            self._vagas.release()
+            raise ServidorOcupado(f"A análise não começou em {self.espera_maxima:.0f}s.")
+        return futuro.result()
+
+    def metricas(self):
+        """Fila e execução agora, contadores e percentis (ms) de espera e duração recentes"""
+        with self._trava:
+            esperas = np.array(self._esperas) * 1000
+            duracoes = np.array(self._duracoes) * 1000
+            metricas = {"na_fila": self._aguardando, "executando": self._executando,
+                        **self.contadores}
+        for nome, valores in (("espera", esperas), ("duracao", duracoes)):
+            for p in (50, 95, 99):
+                metricas[f"{nome}_p{p}_ms"] = float(np.percentile(valores, p)) if len(valores) else 0.0
+        return metricas
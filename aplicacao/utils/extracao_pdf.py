@@ -0,0 +1,146 @@
+"""Extração de texto de PDFs com orçamento de bytes, páginas e tempo.
+
+PDFs curtos são lidos no próprio processo. Os longos são divididos em lotes de
+páginas lidos em paralelo por processos (o PyMuPDF não pode ser usado por várias
+threads ao mesmo tempo), com poucos lotes em andamento por vez; os lotes são
+juntados na ordem das páginas e a leitura para assim que há texto suficiente
+para o embedding ou o tempo acaba, para um PDF escaneado de centenas de páginas
+não prender o servidor.
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from multiprocessing import get_context
+
+import fitz
+
+from aplicacao.utils import configuracao
+
+# Até quantas páginas a extração sequencial sai mais barata que a ida e volta aos processos
+PAGINAS_SEQUENCIAIS = 8
+PAGINAS_POR_LOTE = 4
+
+_executor = None
+_trava_executor = threading.Lock()
+
+
+def _processos():
+    return configuracao.PDF_PROCESSOS or min(4, os.cpu_count() or 1)
+
+
+def _obter_executor():
+    global _executor
+    with _trava_executor:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=_processos(), mp_context=get_context("spawn"))
+        return _executor
+
+
+def _extrair_paginas(caminho, paginas):
+    with fitz.open(caminho) as doc:
+        return [doc[i].get_text() for i in paginas]
+
+
+def extrair_texto_pdf(conteudo, max_paginas=None, max_bytes=None, tempo_maximo=None,
+                      caracteres_suficientes=None):
+    """Texto do PDF em `conteudo` (bytes) e o relatório da extração.
+
+    Retorna um dicionário com "texto", "paginas_lidas", "paginas_total", "motivo_parada"
+    ("fim", "texto_suficiente", "limite_paginas", "tempo" ou "protegido") e "tempos"
+    (segundos por etapa: abrir, paginas, juntar). Levanta ValueError acima de `max_bytes`.
+    """
+    max_paginas = max_paginas or configuracao.PDF_MAX_PAGINAS
+    max_bytes = max_bytes or configuracao.PDF_MAX_BYTES
+    tempo_maximo = tempo_maximo or configuracao.PDF_TEMPO_MAXIMO
+    caracteres_suficientes = caracteres_suficientes or configuracao.PDF_CARACTERES_SUFICIENTES
+
+    if len(conteudo) > max_bytes:
+        raise ValueError(f"O PDF tem {len(conteudo) / 2**20:.1f} MB; o limite é "
+                         f"{max_bytes / 2**20:.1f} MB.")
+
+    inicio = time.perf_counter()
+    prazo = inicio + tempo_maximo
+    tempos = {}
+    with fitz.open(stream=conteudo, filetype="pdf") as doc:
+        paginas_total = doc.page_count
+        protegido = doc.needs_pass
+        paginas = range(min(paginas_total, max_paginas))
+        tempos["abrir"] = time.perf_counter() - inicio
+
+        partes = []
+        caracteres = 0
+        motivo = "fim" if len(paginas) == paginas_total else "limite_paginas"
+        if protegido:
+            motivo = "protegido"
+            paginas = range(0)
+
+        if len(paginas) <= PAGINAS_SEQUENCIAIS or _processos() == 1:
+            for i in paginas:
+                if time.perf_counter() > prazo:
+                    motivo = "tempo"
+                    break
+                partes.append(doc[i].get_text())
+                caracteres += len(partes[-1])
+                if caracteres >= caracteres_suficientes:
+                    motivo = "texto_suficiente"
+                    break
+        else:
+            motivo = _extrair_em_paralelo(conteudo, paginas, prazo, caracteres_suficientes,
+                                          partes) or motivo
+    tempos["paginas"] = time.perf_counter() - inicio - tempos["abrir"]
+
+    marco = time.perf_counter()
+    texto = "".join(partes)
+    tempos["juntar"] = time.perf_counter() - marco
+    return {"texto": texto, "paginas_lidas": len(partes), "paginas_total": paginas_total,
+            "motivo_parada": motivo, "tempos": tempos}
+
+
+def _extrair_em_paralelo(conteudo, paginas, prazo, caracteres_suficientes, partes):
+    """Preenche `partes` na ordem das páginas; devolve o motivo se parou antes do fim"""
+    executor = _obter_executor()
+    lotes = iter([paginas[i:i + PAGINAS_POR_LOTE]
+                  for i in range(0, len(paginas), PAGINAS_POR_LOTE)])
+    # Poucos lotes à frente do que já foi juntado: parar cedo desperdiça pouco trabalho
+    janela = 2 * _processos()
+    pendentes = deque()
+    caracteres = 0
+    motivo = None
+
+    fd, caminho = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(conteudo)
+
+        def encher():
+            while len(pendentes) < janela:
+                lote = next(lotes, None)
+                if lote is None:
+                    return
+                pendentes.append(executor.submit(_extrair_paginas, caminho, list(lote)))
+
+        encher()
+        while pendentes:
+            try:
+                textos = pendentes[0].result(timeout=max(0.0, prazo - time.perf_counter()))
+            except TimeoutError:
+                motivo = "tempo"
+                break
+            pendentes.popleft()
+            partes.extend(textos)
+            caracteres += sum(len(t) for t in textos)
+            if caracteres >= caracteres_suficientes:
+                motivo = "texto_suficiente"
+                break
+            encher()
+    finally:
+        # Só os lotes ainda na fila são cancelados: um lote já em execução (no máximo
+        # PAGINAS_POR_LOTE páginas) segue ocupando seu processo até terminar. O pool é
+        # compartilhado, então encerrar o processo derrubaria os lotes de outras sessões
+        for futuro in pendentes:
+            futuro.cancel()
+        os.remove(caminho)
+    return motivo
@@ -0,0 +1,58 @@
+"""Listas de postagem das vagas por atributo (estado, nível profissional, cliente).
+
+Para cada valor de atributo guarda as linhas (na ordem de job_ids) das vagas
+que o têm, então uma recomendação filtrada só avalia os embeddings dessas linhas.
+"""
+import numpy as np
+
+# Nome do filtro -> (seção, chave) no vagas.json; as colunas do vagas_df são "seção_chave"
+ATRIBUTOS_FILTRO = {
+    "estado": ("perfil_vaga", "estado"),
+    "nivel_profissional": ("perfil_vaga", "nivel profissional"),
+    "cliente": ("informacoes_basicas", "cliente"),
+}
+
+
+class IndiceFiltros:
+    def __init__(self, jobs, job_ids):
+        self.postagens = {}
+        for atributo, (secao, chave) in ATRIBUTOS_FILTRO.items():
+            linhas_por_valor = {}
+            for linha, jid in enumerate(job_ids):
+                valor = jobs.get(jid, {}).get(secao, {}).get(chave)
+                if valor:
+                    linhas_por_valor.setdefault(valor, []).append(linha)
+            self.postagens[atributo] = {
+                valor: np.array(linhas, dtype=np.int64)
+                for valor, linhas in linhas_por_valor.items()}
+
+    def valores(self, atributo):
+        """Valores existentes de um atributo, em ordem alfabética"""
+        return sorted(self.postagens[atributo])
+
+    def linhas(self, filtros):
+        """Linhas (ordenadas) das vagas que atendem a todos os filtros, ou None sem filtros.
+
+        `filtros` mapeia atributo -> valor ou lista de valores; valores de um mesmo
+        atributo são combinados com OU e atributos diferentes com E.
+        """
+        conjuntos = []
+        for atributo, valores in (filtros or {}).items():
+            if atributo not in self.postagens:
+                raise KeyError(f"Filtro desconhecido: {atributo}. Use um de {list(ATRIBUTOS_FILTRO)}.")
+            if isinstance(valores, str):
+                valores = [valores]
+            if not valores:
+                continue
+            postagens = [self.postagens[atributo].get(valor, np.empty(0, dtype=np.int64))
+                         for valor in valores]
+            conjuntos.append(np.unique(np.concatenate(postagens)))
+        if not conjuntos:
+            return None
+
+        # Interseção começando pela menor lista
+        conjuntos.sort(key=len)
+        resultado = conjuntos[0]
+        for conjunto in conjuntos[1:]:
+            resultado = np.intersect1d(resultado, conjunto, assume_unique=True)
+        return resultado
@@ -0,0 +1,121 @@
+"""Índice IVF (arquivo invertido) das vagas: k-means esférico sobre os embeddings
+normalizados e, para cada centróide, a lista das vagas atribuídas a ele.
+
+Na consulta só as listas dos centróides mais próximos do CV são lidas. Como a
+probabilidade do ensemble também é alta para as vagas menos parecidas com o CV
+(o platô perto de similaridade -1), algumas listas mais próximas de -q também
+entram na lista de candidatas.
+"""
+import os
+
+import numpy as np
+
+# Arquivo do IVF dentro da geração do artefato das vagas (artefato_vagas)
+NOME_INDICE_IVF = "job_ivf.npz"
+# Abaixo disso a varredura exata já é rápida e o k-means não compensa
+MINIMO_VAGAS_IVF = 50_000
+# Linhas atribuídas por vez (limita a matriz vetores x centróides em memória)
+BLOCO_ATRIBUICAO = 8192
+
+
+def _atribuir(vetores, centroides):
+    rotulos = np.empty(len(vetores), dtype=np.int32)
+    for inicio in range(0, len(vetores), BLOCO_ATRIBUICAO):
+        bloco = np.asarray(vetores[inicio:inicio + BLOCO_ATRIBUICAO], dtype=np.float32)
+        rotulos[inicio:inicio + len(bloco)] = np.argmax(bloco @ centroides.T, axis=1)
+    return rotulos
+
+
+def _normalizar_linhas(matriz):
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    normas[normas == 0] = 1
+    return matriz / normas
+
+
+def kmeans_esferico(embeddings, n_listas, iteracoes=10, pontos_por_lista=64, semente=42):
+    """Centróides unitários treinados numa amostra de até `pontos_por_lista` * `n_listas` vetores"""
+    rng = np.random.default_rng(semente)
+    n = len(embeddings)
+    amostra = np.sort(rng.choice(n, min(n, pontos_por_lista * n_listas), replace=False))
+    treino = np.asarray(embeddings[amostra], dtype=np.float32)
+    centroides = treino[rng.choice(len(treino), n_listas, replace=False)].copy()
+
+    for _ in range(iteracoes):
+        rotulos = _atribuir(treino, centroides)
+        ordem = np.argsort(rotulos, kind="stable")
+        usados, inicios = np.unique(rotulos[ordem], return_index=True)
+        somas = np.add.reduceat(treino[ordem], inicios, axis=0)
+        vazios = np.setdiff1d(np.arange(n_listas), usados)
+        centroides[usados] = _normalizar_linhas(somas)
+        # Centróide sem vetores recomeça num ponto qualquer da amostra
+        centroides[vazios] = treino[rng.choice(len(treino), len(vazios), replace=False)]
+    return centroides
+
+
+def construir_indice_ivf(embeddings, n_listas=None, centroides=None):
+    """(centroides, ordem, inicios): as vagas da lista j são ordem[inicios[j]:inicios[j + 1]].
+
+    Com `centroides` de uma construção anterior, o k-means é pulado e as vagas só
+    são reatribuídas (usado na ingestão incremental).
+    """
+    if centroides is None:
+        n_listas = n_listas or int(np.sqrt(len(embeddings)))
+        centroides = kmeans_esferico(embeddings, n_listas)
+    rotulos = _atribuir(embeddings, centroides)
+    ordem = np.argsort(rotulos, kind="stable").astype(np.int32)
+    inicios = np.zeros(len(centroides) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rotulos, minlength=len(centroides)), out=inicios[1:])
+    return centroides.astype(np.float32), ordem, inicios
+
+
+def salvar_indice_ivf(embeddings, pasta, pasta_anterior=None):
+    """Grava o IVF em `pasta`, se o catálogo for grande o bastante. Com `pasta_anterior`,
+    reaproveita os centróides do IVF de lá"""
+    if len(embeddings) < MINIMO_VAGAS_IVF:
+        return
+
+    centroides = None
+    anterior = pasta_anterior and os.path.join(pasta_anterior, NOME_INDICE_IVF)
+    if anterior and os.path.exists(anterior):
+        with np.load(anterior) as dados:
+            if dados["centroides"].shape[1] == embeddings.shape[1]:
+                centroides = dados["centroides"]
+    centroides, ordem, inicios = construir_indice_ivf(embeddings, centroides=centroides)
+
+    with open(os.path.join(pasta, NOME_INDICE_IVF), "wb") as f:
+        np.savez(f, centroides=centroides, ordem=ordem, inicios=inicios)
+
+
+def carregar_indice_ivf(pasta, n_esperado, nprobe=16):
+    """IndiceIVF da geração em `pasta`, ou None se ausente ou de outra versão do catálogo"""
+    caminho = os.path.join(pasta, NOME_INDICE_IVF)
+    if not os.path.exists(caminho):
+        return None
+    with np.load(caminho) as dados:
+        centroides, ordem, inicios = dados["centroides"], dados["ordem"], dados["inicios"]
+    if len(ordem) != n_esperado:
+        return None
+    return IndiceIVF(centroides, ordem, inicios, nprobe)
+
+
+class IndiceIVF:
+    def __init__(self, centroides, ordem, inicios, nprobe=16):
+        self.centroides = centroides
+        self.ordem = ordem
+        self.inicios = inicios
+        self.nprobe = min(nprobe, len(centroides))
+        # Para o platô de baixa similaridade bastam poucas listas: ali a
+        # probabilidade só varia devagar com a similaridade
+        self.nprobe_oposto = min(max(1, nprobe // 4), len(centroides))
+
+    def __len__(self):
+        return len(self.ordem)
+
+    def candidatos(self, q, pontuar=None):
+        """Índices (ordenados) das vagas nas listas visitadas para a consulta `q` normalizada"""
+        afinidades = self.centroides @ q
+        proximas = np.argpartition(-afinidades, self.nprobe - 1)[:self.nprobe]
+        opostas = np.argpartition(afinidades, self.nprobe_oposto - 1)[:self.nprobe_oposto]
+        listas = np.union1d(proximas, opostas)
+        return np.sort(np.concatenate(
+            [self.ordem[self.inicios[j]:self.inicios[j + 1]] for j in listas]))
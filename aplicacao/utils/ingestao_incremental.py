@@ -0,0 +1,314 @@
+"""Aplicação de deltas diários (vagas novas, alteradas ou removidas e mudanças de
+status de prospects) sobre os artefatos já gerados, sem refazer a base inteira.
+
+Formato do arquivo de delta (JSON):
+    {
+        "versao": 43,
+        "vagas": {"<id_vaga>": {<registro completo, como no vagas.json>}},
+        "vagas_removidas": ["<id_vaga>", ...],
+        "prospects": [{"job_id": "<id_vaga>", "codigo": "<candidato>",
+                       "situacao_candidado": "...", ...}]
+    }
+
+Cada registro guarda a versão do último delta que o alterou; um delta só é
+aplicado a registros com versão menor, então reaplicar ou receber deltas fora
+de ordem não desfaz alterações mais novas.
+
+Os deltas aplicados ficam registrados em PASTA_DELTAS, com o hash do dados.zip
+sobre o qual foram aplicados, e são reaplicados quando o snapshot ou o catálogo
+de vagas (modelo.gerar_embeddings_vagas) é refeito dos JSONs. Com um dados.zip
+novo, a exportação já é mais recente que eles: os deltas registrados para outro
+zip são descartados.
+"""
+import glob
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from aplicacao.utils.artefato_vagas import (
+    carregar_artefato_vagas, carregar_vagas_pkl, salvar_artefato_vagas)
+from aplicacao.utils.carregar_dados import (
+    carregar_base, garantir_dados_extraidos, identidade_fontes, impressao_digital_fontes,
+    montar_vagas_df)
+from aplicacao.utils.snapshot_dados import (
+    carregar_snapshot, ler_meta_snapshot, salvar_snapshot, tipar_colunas)
+
+PASTA_DELTAS = "aplicacao/dados/deltas"
+
+
+def ler_delta(caminho):
+    with open(caminho, "r", encoding="utf-8") as f:
+        delta = json.load(f)
+    if "versao" not in delta:
+        raise ValueError(f"Delta {caminho} sem o campo 'versao'.")
+    return delta
+
+
+def _versoes_vazias():
+    return {"vagas": {}, "prospects": {}}
+
+
+def _chave_prospect(job_id, codigo):
+    return f"{job_id}:{codigo}"
+
+
+def filtrar_delta(delta, versoes):
+    """Mantém só as alterações mais novas que a versão registrada de cada registro"""
+    versao = delta["versao"]
+    vagas_v = versoes["vagas"]
+    prospects_v = versoes["prospects"]
+
+    vagas = {str(jid): job for jid, job in delta.get("vagas", {}).items()
+             if vagas_v.get(str(jid), -1) < versao}
+    removidas = [str(jid) for jid in delta.get("vagas_removidas", [])
+                 if vagas_v.get(str(jid), -1) < versao]
+    prospects = [dict(p, job_id=str(p["job_id"]), codigo=str(p["codigo"]))
+                 for p in delta.get("prospects", [])
+                 if prospects_v.get(_chave_prospect(p["job_id"], p["codigo"]), -1) < versao]
+
+    for jid in list(vagas) + removidas:
+        vagas_v[jid] = versao
+    for p in prospects:
+        prospects_v[_chave_prospect(p["job_id"], p["codigo"])] = versao
+
+    return vagas, removidas, prospects
+
+
+def _sem_categorias(df):
+    # Categóricas não aceitam valores novos; o snapshot volta a tipar no final
+    return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+
+def aplicar_delta_frames(vagas_df, prospects_df, vagas, removidas, prospects):
+    """Aplica as alterações filtradas nos DataFrames carregados e devolve novos DataFrames"""
+    if vagas or removidas:
+        alteradas = set(vagas) | set(removidas)
+        vagas_df = _sem_categorias(vagas_df)
+        vagas_df = vagas_df[~vagas_df["job_id"].astype(str).isin(alteradas)]
+        if vagas:
+            vagas_df = pd.concat([vagas_df, montar_vagas_df(vagas)], ignore_index=True)
+        vagas_df = tipar_colunas(vagas_df.reset_index(drop=True))
+
+    if prospects and prospects_df.empty:
+        prospects_df = tipar_colunas(pd.DataFrame(prospects))
+    elif prospects:
+        colunas = list(prospects_df.columns)
+        atual = _sem_categorias(prospects_df)
+        atual = atual.astype({"job_id": str, "codigo": str}).set_index(["job_id", "codigo"])
+        novos = pd.DataFrame(prospects).drop_duplicates(["job_id", "codigo"], keep="last")
+        novos = novos.set_index(["job_id", "codigo"])
+
+        existentes = novos.index.isin(atual.index)
+        atual.update(novos[existentes])
+        prospects_df = pd.concat([atual, novos[~existentes]]).reset_index()
+        colunas += [c for c in prospects_df.columns if c not in colunas]
+        prospects_df = tipar_colunas(prospects_df[colunas])
+
+    return vagas_df, prospects_df
+
+
+def aplicar_delta_titulos(titulos_vagas_df, vagas):
+    """Atualiza o título (e mantém a modalidade) das vagas do delta no mapa usado pelo
+    painel de candidatos; vagas removidas continuam nele porque seus prospects ficam"""
+    if not vagas:
+        return titulos_vagas_df
+    modalidades = titulos_vagas_df.set_index("job_id")["modalidade"]
+    novos = pd.DataFrame([
+        {"job_id": jid, "titulo": job.get("informacoes_basicas", {}).get("titulo_vaga", ""),
+         "modalidade": modalidades.get(jid, "")}
+        for jid, job in vagas.items()])
+    mantidos = titulos_vagas_df[~titulos_vagas_df["job_id"].isin(list(vagas))]
+    return pd.concat([mantidos, novos], ignore_index=True)
+
+
+def aplicar_delta_snapshot(frames, vagas, removidas, prospects):
+    """Aplica as alterações filtradas a todos os DataFrames do snapshot"""
+    vagas_df, prospects_df = aplicar_delta_frames(
+        frames["vagas"], frames["prospects"], vagas, removidas, prospects)
+    return {"vagas": vagas_df, "prospects": prospects_df,
+            "titulos_vagas": aplicar_delta_titulos(frames["titulos_vagas"], vagas)}
+
+
+def registrar_delta(delta, fonte):
+    """Guarda o delta aplicado sobre a exportação `fonte` (identidade_fontes) para
+    reaplicá-lo se o snapshot ou o catálogo for refeito"""
+    os.makedirs(PASTA_DELTAS, exist_ok=True)
+
+    def gravar(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(delta, fonte_dados=fonte), f, ensure_ascii=False)
+
+    _gravar_atomico(os.path.join(PASTA_DELTAS, f"delta_{delta['versao']}.json"), gravar)
+
+
+def deltas_registrados(fonte):
+    """Deltas registrados sobre a exportação `fonte`, em ordem de versão; os de outra
+    exportação são apagados"""
+    deltas = []
+    for caminho in glob.glob(os.path.join(PASTA_DELTAS, "*.json")):
+        delta = ler_delta(caminho)
+        if delta.get("fonte_dados") != fonte:
+            os.remove(caminho)
+            print(f"Delta {caminho} descartado: registrado sobre outro dados.zip.")
+            continue
+        deltas.append(delta)
+    return sorted(deltas, key=lambda d: d["versao"])
+
+
+def reaplicar_deltas_registrados(frames, fonte):
+    """Reaplica os deltas registrados sobre `fonte` a um snapshot refeito dos JSONs;
+    devolve os DataFrames e as versões dos registros"""
+    versoes = _versoes_vazias()
+    deltas = deltas_registrados(fonte)
+    for delta in deltas:
+        frames = aplicar_delta_snapshot(frames, *filtrar_delta(delta, versoes))
+    if deltas:
+        print(f"{len(deltas)} delta(s) reaplicado(s) ao snapshot refeito "
+              f"(até a versão {deltas[-1]['versao']}).")
+    return frames, versoes
+
+
+def reaplicar_deltas_vagas(jobs, fonte):
+    """Aplica ao dicionário de vagas lido do vagas.json os deltas registrados sobre
+    `fonte`, para o catálogo refeito ter as mesmas vagas que o snapshot"""
+    versoes = _versoes_vazias()
+    for delta in deltas_registrados(fonte):
+        vagas, removidas, _ = filtrar_delta(delta, versoes)
+        for jid in removidas:
+            jobs.pop(jid, None)
+        jobs.update(vagas)
+    return jobs
+
+
+def aplicar_delta_embeddings(jobs, job_data, vagas, removidas, codificar):
+    """Atualiza o dicionário de vagas e a matriz de embeddings, codificando só as vagas do delta"""
+    job_ids = list(job_data["job_ids"])
+    job_titles = list(job_data["job_titles"])
+    embeddings = np.array(job_data["job_embeddings"])
+    posicao = {jid: i for i, jid in enumerate(job_ids)}
+
+    manter = np.ones(len(job_ids), dtype=bool)
+    for jid in removidas:
+        jobs.pop(jid, None)
+        if jid in posicao:
+            manter[posicao[jid]] = False
+
+    if vagas:
+        ids_delta = list(vagas)
+        vetores = np.asarray(codificar([vagas[jid] for jid in ids_delta]), dtype=embeddings.dtype)
+        novos = []
+        for jid, vetor in zip(ids_delta, vetores):
+            jobs[jid] = vagas[jid]
+            titulo = vagas[jid]["informacoes_basicas"]["titulo_vaga"]
+            if jid in posicao:
+                i = posicao[jid]
+                embeddings[i] = vetor
+                job_titles[i] = titulo
+                manter[i] = True
+            else:
+                novos.append((jid, titulo, vetor))
+    else:
+        novos = []
+
+    job_ids = [jid for jid, m in zip(job_ids, manter) if m]
+    job_titles = [t for t, m in zip(job_titles, manter) if m]
+    embeddings = embeddings[manter]
+    if novos:
+        job_ids += [jid for jid, _, _ in novos]
+        job_titles += [t for _, t, _ in novos]
+        embeddings = np.vstack([embeddings, np.stack([v for _, _, v in novos])])
+
+    return jobs, {"job_ids": job_ids, "job_titles": job_titles, "job_embeddings": embeddings}
+
+
+def codificador_padrao(pooling_janelas=None, backend=None):
+    """Mesmo pré-processamento, modelo, modo de codificação, backend e cache usados em
+    modelo.gerar_embeddings_vagas"""
+    from aplicacao.utils import configuracao
+    from aplicacao.utils.cache_embeddings import CacheEmbeddings
+    from aplicacao.utils.codificacao_janelas import codificar_em_janelas
+    from aplicacao.utils.codificador import carregar_codificador
+    from aplicacao.utils.preprocessamento import preprocessar_lote
+    from modelo import NOME_MODELO_EMBEDDINGS, extract_job_requirements, versao_embeddings_vagas
+
+    backend = backend or configuracao.BACKEND_CODIFICADOR
+    model = carregar_codificador(NOME_MODELO_EMBEDDINGS, backend)
+    cache = CacheEmbeddings(NOME_MODELO_EMBEDDINGS, versao_embeddings_vagas(pooling_janelas, backend))
+    if pooling_janelas is None:
+        encode = model.encode
+    else:
+        def encode(textos):
+            return codificar_em_janelas(model, textos, pooling_janelas)
+
+    def codificar(vagas):
+        vetores = cache.codificar(
+            preprocessar_lote(extract_job_requirements(job) for job in vagas), encode)
+        cache.relatorio()
+        cache.salvar()
+        return vetores
+
+    return codificar
+
+
+def _gravar_atomico(caminho, gravar):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+    os.close(fd)
+    gravar(tmp)
+    os.replace(tmp, caminho)
+
+
+def ingerir_delta(caminho_delta, codificar=None):
+    """Aplica um arquivo de delta ao snapshot de dados e aos artefatos de embeddings"""
+    inicio = time.perf_counter()
+    delta = ler_delta(caminho_delta)
+
+    garantir_dados_extraidos()
+    digital = impressao_digital_fontes()
+    nomes = ["vagas", "prospects", "titulos_vagas"]
+    frames = carregar_snapshot(nomes, digital)
+    if frames is None:
+        carregar_base()
+        frames = carregar_snapshot(nomes, digital)
+    versoes = (ler_meta_snapshot() or {}).get("versoes_registros") or _versoes_vazias()
+
+    vagas, removidas, prospects = filtrar_delta(delta, versoes)
+    frames = aplicar_delta_snapshot(frames, vagas, removidas, prospects)
+
+    if vagas or removidas:
+        job_data = carregar_artefato_vagas(mmap=False)
+        if job_data is None:
+            raise FileNotFoundError(
+                "Artefato de embeddings das vagas ausente: rode modelo.gerar_embeddings_vagas() "
+                "antes de aplicar deltas de vagas.")
+        jobs = carregar_vagas_pkl(job_data["pasta"])
+        jobs, job_data = aplicar_delta_embeddings(
+            jobs, job_data, vagas, removidas, codificar or codificador_padrao())
+        # Embeddings, índices e vagas.pkl publicados juntos, numa geração nova
+        salvar_artefato_vagas(job_data["job_ids"], job_data["job_titles"], job_data["job_embeddings"],
+                              jobs=jobs)
+
+    # As versões só são gravadas depois de todos os artefatos: se algo falhar antes,
+    # o delta inteiro volta a ser aplicado na próxima execução
+    salvar_snapshot(frames, digital, versoes)
+    registrar_delta(delta, identidade_fontes())
+
+    resumo = {
+        "versao": delta["versao"],
+        "vagas_alteradas": len(vagas),
+        "vagas_removidas": len(removidas),
+        "prospects_alterados": len(prospects),
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
+    print(f"Delta {caminho_delta} aplicado: {resumo}")
+    return resumo
+
+
+if __name__ == "__main__":
+    import sys
+
+    for caminho in sys.argv[1:]:
+        ingerir_delta(caminho)
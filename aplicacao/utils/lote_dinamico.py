@@ -0,0 +1,100 @@
+"""Lotes dinâmicos de codificação: CVs de sessões diferentes que chegam quase juntos
+passam pelo modelo em um único lote.
+
+Cada pedido entra em uma fila; uma thread despachante pega o primeiro, espera até
+`espera_maxima_ms` (ou até juntar `tamanho_maximo` pedidos), codifica o lote de uma
+vez e entrega a cada sessão o seu vetor. Enquanto um lote está no modelo, os
+pedidos que chegam já formam o próximo, então sob carga os lotes crescem sozinhos
+e, com uma só sessão, o custo extra é no máximo a janela de espera.
+"""
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from aplicacao.utils.executor_inferencia import JANELA_METRICAS, ServidorOcupado
+
+
+class DespachanteLotes:
+    def __init__(self, codificar_lote, tamanho_maximo=16, espera_maxima_ms=2.0,
+                 despachantes=1, maximo_pendentes=128):
+        """`codificar_lote(textos)` devolve um vetor por texto, na ordem"""
+        self.codificar_lote = codificar_lote
+        self.tamanho_maximo = tamanho_maximo
+        self.espera_maxima = espera_maxima_ms / 1000
+        self.despachantes = despachantes
+        self.maximo_pendentes = maximo_pendentes
+        self._fila = queue.Queue()
+        self._trava = threading.Lock()
+        self._threads = []
+        self._tamanhos = Counter()
+        self._esperas = deque(maxlen=JANELA_METRICAS)
+
+    def _iniciar(self):
+        with self._trava:
+            while len(self._threads) < self.despachantes:
+                thread = threading.Thread(target=self._despachar, daemon=True,
+                                          name=f"lotes-{len(self._threads)}")
+                thread.start()
+                self._threads.append(thread)
+
+    def codificar(self, texto):
+        """Vetor de `texto`, codificado no próximo lote (ServidorOcupado com a fila cheia)"""
+        if self._fila.qsize() >= self.maximo_pendentes:
+            raise ServidorOcupado("Fila de codificação cheia.")
+        self._iniciar()
+        futuro = Future()
+        self._fila.put((texto, futuro, time.perf_counter()))
+        return futuro.result()
+
+    def _juntar_lote(self):
+        lote = [self._fila.get()]
+        prazo = time.perf_counter() + self.espera_maxima
+        while len(lote) < self.tamanho_maximo:
+            try:
+                # Primeiro o que já está na fila; depois, o que chegar até o prazo
+                lote.append(self._fila.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            restante = prazo - time.perf_counter()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self._fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _despachar(self):
+        while True:
+            lote = self._juntar_lote()
+            inicio = time.perf_counter()
+            with self._trava:
+                self._tamanhos[len(lote)] += 1
+                self._esperas.extend(inicio - chegada for _, _, chegada in lote)
+            try:
+                vetores = self.codificar_lote([texto for texto, _, _ in lote])
+            except Exception as erro:
+                for _, futuro, _ in lote:
+                    futuro.set_exception(erro)
+                continue
+            for (_, futuro, _), vetor in zip(lote, vetores):
+                futuro.set_result(vetor)
+
+    def metricas(self):
+        """Lotes formados, tamanho médio e percentis (ms) da espera até o lote começar"""
+        with self._trava:
+            tamanhos = Counter(self._tamanhos)
+            esperas = np.array(self._esperas) * 1000
+        lotes = sum(tamanhos.values())
+        pedidos = sum(tamanho * n for tamanho, n in tamanhos.items())
+        metricas = {"lotes": lotes, "pedidos": pedidos,
+                    "tamanho_medio": pedidos / lotes if lotes else 0.0,
+                    "tamanhos": dict(sorted(tamanhos.items()))}
+        for p in (50, 95):
+            metricas[f"espera_p{p}_ms"] = float(np.percentile(esperas, p)) if len(esperas) else 0.0
+        return metricas
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# Tabela (2, n): linha 0 = similaridade, linha 1 = probabilidade do ensemble
+CAMINHO_TABELA_ENSEMBLE = "aplicacao/modelo/ensemble_lut.npy"
+
+
+def montar_metadados_vagas(jobs, job_ids):
+    """Monta os metadados das vagas em arrays alinhados com job_ids"""
+    def coluna(extrair):
+        return np.fromiter((extrair(jobs.get(jid, {})) for jid in job_ids),
+                           dtype=object, count=len(job_ids))
+
+    return {
+        "id_vaga": np.fromiter(job_ids, dtype=object, count=len(job_ids)),
+        "titulo_da_vaga": coluna(
+            lambda job: job.get("informacoes_basicas", {}).get("titulo_vaga", "N/A")),
+        "area": coluna(
+            lambda job: job.get("perfil_vaga", {}).get("areas_atuacao", "N/A")),
+        "habilidades": coluna(
+            lambda job: job.get("perfil_vaga", {}).get("competencia_tecnicas_e_comportamentais", "Não informado")),
+        "atividades": coluna(
+            lambda job: job.get("perfil_vaga", {}).get("principais_atividades", "Não informado")),
+    }
+
+
+def similaridades_cosseno(cv_vec, job_embeddings):
+    """Similaridade de cosseno como produto escalar sobre embeddings de vagas já normalizados"""
+    cv_vec = np.asarray(cv_vec, dtype=np.float32).reshape(-1)
+    norma = np.linalg.norm(cv_vec)
+    if norma:
+        cv_vec = cv_vec / norma
+    return job_embeddings @ cv_vec
+
+
+def pontuar_ensemble(sims, logreg, xgb):
+    """Probabilidade do ensemble para todo o vetor de similaridades em uma única chamada"""
+    X = np.asarray(sims).reshape(-1, 1)
+    logreg_probs = logreg.predict_proba(X)[:, 1]
+    xgb_probs = xgb.predict_proba(X)[:, 1]
+    return (logreg_probs + xgb_probs) / 2
+
+
+def pontuar_tabela(sims, tabela):
+    """Probabilidade do ensemble interpolada da tabela pré-calculada"""
+    return np.interp(np.asarray(sims, dtype=np.float64), tabela[0], tabela[1])
+
+
+def selecionar_top_k(scores, k):
+    """Índices dos k maiores scores em ordem decrescente, sem ordenar o vetor inteiro.
+
+    Empates mantêm a ordem original, como o `sorted(..., reverse=True)` estável.
+    """
+    scores = np.asarray(scores)
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < n:
+        # Tudo que empata com o k-ésimo valor entra na disputa final
+        limiar = np.partition(scores, n - k)[n - k]
+        candidatos = np.flatnonzero(scores >= limiar)
+    else:
+        candidatos = np.arange(n)
+
+    ordem = np.argsort(-scores[candidatos], kind="stable")
+    return candidatos[ordem[:k]]
+
+
+def montar_recomendacoes(indices, metadados, sims, probs):
+    """DataFrame de recomendações no mesmo formato usado pela página 1.
+
+    `sims` e `probs` já correspondem, posição a posição, a `indices`.
+    """
+    return pd.DataFrame({
+        "id_vaga": metadados["id_vaga"][indices],
+        "titulo_da_vaga": metadados["titulo_da_vaga"][indices],
+        "area": metadados["area"][indices],
+        "habilidades": metadados["habilidades"][indices],
+        "atividades": metadados["atividades"][indices],
+        "similaridade": sims,
+        "probabilidade_de_contratacao": probs,
+    })
+
+
+def recomendar(cv_vec, job_embeddings, metadados, pontuar, top_n=5, indice=None, linhas=None):
+    """Top vagas por probabilidade do ensemble para um CV já codificado.
+
+    Com `linhas` (de IndiceFiltros.linhas), só essas vagas são avaliadas. Com um
+    `indice` (IndiceInt8, IndiceIVF), só as de `indice.candidatos`; sem nenhum
+    dos dois, todas as vagas são avaliadas com os embeddings float32.
+    """
+    if indice is None and linhas is None:
+        sims = similaridades_cosseno(cv_vec, job_embeddings)
+        probs = pontuar(sims)
+        top_idx = selecionar_top_k(probs, top_n)
+        return montar_recomendacoes(top_idx, metadados, sims[top_idx], probs[top_idx])
+
+    cv_vec = np.asarray(cv_vec, dtype=np.float32).reshape(-1)
+    norma = np.linalg.norm(cv_vec)
+    q = cv_vec / norma if norma else cv_vec
+    # O filtro já restringe a busca às linhas que interessam; o índice aproximado
+    # só entra nas consultas sem filtro
+    candidatos = linhas if linhas is not None else indice.candidatos(q, pontuar)
+
+    sims = similaridades_cosseno(q, job_embeddings[candidatos])
+    probs = pontuar(sims)
+    top = selecionar_top_k(probs, top_n)
+    return montar_recomendacoes(candidatos[top], metadados, sims[top], probs[top])
@@ -0,0 +1,172 @@
+"""Recomendação de vagas para um currículo, sem interface: catálogo de vagas, modelo
+de embeddings, executor de inferência e lotes dinâmicos.
+
+Usado pela página 1 (no próprio processo do Streamlit) e pelo servico_inferencia
+(um processo à parte, compartilhado pelas réplicas do app).
+"""
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from aplicacao.utils import configuracao
+from aplicacao.utils.artefato_vagas import (
+    PASTA_MODELO, carregar_artefato_vagas, carregar_indice_int8, carregar_vagas_pkl, normalizar)
+from aplicacao.utils.codificacao_janelas import codificar_em_janelas
+from aplicacao.utils.codificador import carregar_codificador
+from aplicacao.utils.executor_inferencia import ExecutorInferencia
+from aplicacao.utils.filtros_vagas import ATRIBUTOS_FILTRO, IndiceFiltros
+from aplicacao.utils.indice_ivf import carregar_indice_ivf
+from aplicacao.utils.lote_dinamico import DespachanteLotes
+from aplicacao.utils.preprocessamento import VERSAO_PREPROCESSAMENTO, preprocessar
+from aplicacao.utils.registro_modelos import registro
+from aplicacao.utils.motor_recomendacao import (
+    CAMINHO_TABELA_ENSEMBLE, montar_metadados_vagas, pontuar_ensemble, pontuar_tabela, recomendar)
+
+NOME_MODELO_EMBEDDINGS = 'paraphrase-multilingual-MiniLM-L12-v2'
+MODO_CODIFICACAO_CV = (f"janelas-{configuracao.POOLING_JANELAS}-{configuracao.MAX_JANELAS_CV}"
+                       if configuracao.CODIFICACAO_CV == "janelas" else "truncada")
+# Faz parte das chaves do cache de currículos: outro modelo, pré-processamento,
+# modo de codificação ou backend invalida as entradas
+VERSAO_MODELO_CV = (f"{NOME_MODELO_EMBEDDINGS}:preprocess-{VERSAO_PREPROCESSAMENTO}:"
+                    f"{MODO_CODIFICACAO_CV}:{configuracao.BACKEND_CODIFICADOR}")
+
+
+def load_models():
+    """Carrega as vagas, os embeddings e o ensemble (o modelo de embeddings fica em obter_modelo_embeddings);
+    o último item é a pasta da geração do artefato lida, para os índices virem da mesma"""
+    # Com a tabela exportada por modelo.exportar_tabela_ensemble, sklearn e xgboost
+    # não precisam ser carregados no processo do servidor
+    if os.path.exists(CAMINHO_TABELA_ENSEMBLE):
+        tabela_ensemble = np.load(CAMINHO_TABELA_ENSEMBLE)
+        logreg = xgb = None
+    else:
+        tabela_ensemble = None
+        logreg = joblib.load("aplicacao/modelo/logistic_model.pkl")
+        xgb = joblib.load("aplicacao/modelo/xgboost_model.pkl")
+
+    # Embeddings normalizados em mmap; o job_data.pkl antigo fica só como alternativa
+    job_data = carregar_artefato_vagas()
+    if job_data is None:
+        job_data = joblib.load("aplicacao/modelo/job_data.pkl")
+        job_data["job_embeddings"] = normalizar(job_data["job_embeddings"])
+        job_data["pasta"] = PASTA_MODELO
+    elif job_data["versao_preprocessamento"] != VERSAO_PREPROCESSAMENTO:
+        print(f"Aviso: embeddings das vagas gerados com o pré-processamento "
+              f"v{job_data['versao_preprocessamento']}, mas o servidor usa o "
+              f"v{VERSAO_PREPROCESSAMENTO}; rode modelo.gerar_embeddings_vagas().")
+    jobs = carregar_vagas_pkl(job_data["pasta"])
+    return (jobs, logreg, xgb, tabela_ensemble, job_data["job_ids"], job_data["job_titles"],
+            job_data["job_embeddings"], job_data["pasta"])
+
+
+def carregar_indice_vagas(pasta, n_vagas):
+    """Índice aproximado da geração em `pasta` escolhido em configuracao.INDICE_VAGAS
+    (None = varredura exata)"""
+    if configuracao.INDICE_VAGAS == "int8":
+        return carregar_indice_int8(pasta, n_vagas, configuracao.TAMANHO_SHORTLIST)
+    if configuracao.INDICE_VAGAS == "ivf":
+        return carregar_indice_ivf(pasta, n_vagas, configuracao.IVF_NPROBE)
+    return None
+
+
+class CatalogoVagas:
+    """Vagas, embeddings, ensemble e índices usados nas recomendações"""
+
+    def __init__(self):
+        (self.jobs, self.logreg, self.xgb, self.tabela_ensemble, self.job_ids,
+         self.job_titles, self.job_embeddings, pasta) = load_models()
+        self.job_metadados = montar_metadados_vagas(self.jobs, self.job_ids)
+        self.indice_filtros = IndiceFiltros(self.jobs, self.job_ids)
+        self.indice_vagas = carregar_indice_vagas(pasta, len(self.job_ids))
+        if self.xgb is not None:
+            self.xgb.set_params(n_jobs=executor_inferencia.threads_por_trabalhador)
+
+    def pontuar_probabilidade(self, sims):
+        if self.tabela_ensemble is not None:
+            return pontuar_tabela(sims, self.tabela_ensemble)
+        return pontuar_ensemble(sims, self.logreg, self.xgb)
+
+
+# Um catálogo e um modelo por processo, no registro_modelos: em geral já carregados
+# pelo aquecimento em segundo plano; senão, no primeiro uso (esperando o
+# carregamento em andamento, se houver)
+def obter_catalogo():
+    return registro.obter("catalogo", CatalogoVagas)
+
+
+def obter_modelo_embeddings():
+    return registro.obter("modelo_embeddings", lambda: carregar_codificador(NOME_MODELO_EMBEDDINGS))
+
+
+def valores_filtros():
+    """Valores de cada atributo de filtro no catálogo, para as opções da página 1"""
+    indice_filtros = obter_catalogo().indice_filtros
+    return {atributo: indice_filtros.valores(atributo) for atributo in ATRIBUTOS_FILTRO}
+
+
+# Codificação e pontuação de todas as sessões passam por aqui (um pool por processo)
+executor_inferencia = ExecutorInferencia(
+    configuracao.INFERENCIA_TRABALHADORES, configuracao.INFERENCIA_FILA,
+    configuracao.INFERENCIA_THREADS, configuracao.INFERENCIA_ESPERA_MAXIMA)
+
+
+def codificar_lote_cvs(cleaned_cvs):
+    """Embeddings de CVs já pré-processados, em um único lote"""
+    embedding_model = obter_modelo_embeddings()
+    if configuracao.CODIFICACAO_CV == "janelas":
+        return codificar_em_janelas(embedding_model, cleaned_cvs, configuracao.POOLING_JANELAS,
+                                    max_janelas=configuracao.MAX_JANELAS_CV)
+    return embedding_model.encode(cleaned_cvs, batch_size=len(cleaned_cvs))
+
+
+# CVs de sessões diferentes que chegam juntos viram um lote; cada lote roda no executor
+despachante_lotes = DespachanteLotes(
+    lambda cleaned_cvs: executor_inferencia.executar(codificar_lote_cvs, cleaned_cvs),
+    configuracao.LOTE_MAXIMO, configuracao.LOTE_ESPERA_MS, executor_inferencia.trabalhadores,
+    configuracao.INFERENCIA_FILA * configuracao.LOTE_MAXIMO)
+
+
+def codificar_cv(cv_text):
+    """Embedding do currículo (1 x dimensão), no lote dinâmico quando ativado"""
+    cleaned_cv = preprocessar(cv_text)
+    # Dentro de um trabalhador não dá para esperar o despachante, que precisa de um trabalhador livre
+    if configuracao.LOTE_MAXIMO <= 1 or executor_inferencia.em_trabalhador():
+        return executor_inferencia.executar(codificar_lote_cvs, [cleaned_cv])
+    return despachante_lotes.codificar(cleaned_cv)[None, :]
+
+
+def metricas_inferencia():
+    """Métricas do executor (com trabalhadores e threads) e dos lotes de codificação"""
+    metricas = {**executor_inferencia.metricas(),
+                "trabalhadores": executor_inferencia.trabalhadores,
+                "threads_por_trabalhador": executor_inferencia.threads_por_trabalhador}
+    return metricas, despachante_lotes.metricas()
+
+
+def aquecer():
+    """Carrega catálogo e modelo e faz uma recomendação de teste (tokenizer, grafo do
+    modelo, stopwords e páginas do mmap de embeddings prontos para o primeiro CV)"""
+    obter_catalogo()
+    # nltk (e com ele scipy e sklearn) antes do torch: o scipy consulta sys.modules["torch"]
+    # ao ser importado e quebra se outra thread estiver no meio da importação do torch
+    preprocessar("aquecimento")
+    obter_modelo_embeddings()
+    predict_jobs_for_cv("experiência profissional desenvolvimento sistemas projetos " * 20)
+
+
+def predict_jobs_for_cv(cv_text, top_n=5, filtros=None, cv_vec=None):
+    """Prediz as melhores vagas para um currículo.
+
+    `filtros` restringe as vagas, p.ex. {"estado": "São Paulo", "cliente": [...]}
+    (atributos em filtros_vagas.ATRIBUTOS_FILTRO). `cv_vec` evita recodificar
+    um currículo cujo embedding já está em cache.
+    """
+    catalogo = obter_catalogo()
+    linhas = catalogo.indice_filtros.linhas(filtros)
+    if linhas is not None and len(linhas) == 0:
+        return pd.DataFrame()
+    if cv_vec is None:
+        cv_vec = codificar_cv(cv_text)
+    return recomendar(cv_vec, catalogo.job_embeddings, catalogo.job_metadados,
+                      catalogo.pontuar_probabilidade, top_n, indice=catalogo.indice_vagas,
+                      linhas=linhas)
@@ -3,7 +3,7 @@ import numpy as np
 from sklearn.cluster import KMeans
 import pandas as pd
 import streamlit as st
-from aplicacao.utils.carregar_dados import carregar_base
+from aplicacao.utils.carregar_dados import carregar_base, montar_titulos_vagas
 
 
 def limpar_remuneracao(texto):
@@ -74,20 +74,58 @@ def limpar_remuneracao(texto):
 
 
 
+# Situações agrupadas como "Aprovado" no painel de candidatos
+APROVADOS = [
+    "Aprovado",
+    "Contratado como Hunting",
+    "Contratado pela Decision",
+    "Proposta Aceita"
+]
+
+
+# Formato de data_candidatura na base. Sem ele, o to_datetime deduz mês-dia-ano do
+# primeiro valor: dias acima de 12 viram NaT e os demais caem no mês errado
+FORMATO_DATA_CANDIDATURA = '%d-%m-%Y'
+
+
+def _converter_datas(datas):
+    """Datas dd-mm-aaaa da base (inválidas viram NaT), convertendo cada valor distinto uma vez"""
+    datas = datas.astype('category')
+    convertidas = pd.to_datetime(datas.cat.categories, format=FORMATO_DATA_CANDIDATURA, errors='coerce')
+    codigos = datas.cat.codes.to_numpy()
+    valores = np.where(codigos >= 0, convertidas.to_numpy()[codigos], np.datetime64('NaT'))
+    return pd.Series(valores, index=datas.index, dtype='datetime64[ns]')
+
+
+def montar_painel_candidatos(prospects_df, titulos_vagas_df):
+    """Quadro da página 4, montado uma vez no carregamento: cada prospect com título e
+    modalidade da vaga, situação agrupada, data e mês de candidatura convertidos, com
+    as colunas repetitivas categóricas; a página só filtra e agrega"""
+    job_ids = prospects_df['job_id']
+    vagas = titulos_vagas_df.set_index('job_id')
+    titulos, modalidades = vagas['titulo'], vagas['modalidade']
+
+    situacao = prospects_df['situacao_candidado']
+    data = _converter_datas(prospects_df['data_candidatura'])
+    painel = prospects_df.assign(
+        titulo_vaga=job_ids.map(titulos).astype(object).fillna("").astype('category'),
+        modalidade=job_ids.map(modalidades).astype(object).fillna("").astype('category'),
+        situacao_candidado_agrupado=situacao.astype(object).where(
+            ~situacao.isin(APROVADOS), "Aprovado").astype('category'),
+        data_candidatura_dt=data,
+        # Último dia do mês, o mesmo rótulo do resample('M') do gráfico mensal
+        mes_candidatura=data.dt.normalize() + pd.offsets.MonthEnd(0),
+    )
+    return painel
+
+
 def preparar_candidatos_df(prospects_json=None, vagas_df=None, prospects_df=None):
     if not all([vagas_df, prospects_df, prospects_json]):
         # Ajustado para ignorar apenas o que não será usado
-        vagas_df, prospects_df, _, prospects_json, _ = carregar_base()
-
-    # Agrupar status de aprovação
-    aprovados = [
-        "Aprovado",
-        "Contratado como Hunting",
-        "Contratado pela Decision",
-        "Proposta Aceita"
-    ]
-    prospects_df['situacao_candidado_agrupado'] = prospects_df['situacao_candidado'].apply(
-        lambda x: "Aprovado" if x in aprovados else x
-    )
+        vagas_df, prospects_df, _, prospects_json, _, titulos_vagas_df = carregar_base()
+    else:
+        titulos_vagas_df = montar_titulos_vagas(prospects_json)
+
+    prospects_df = montar_painel_candidatos(prospects_df, titulos_vagas_df)
 
     return vagas_df, prospects_df, prospects_json
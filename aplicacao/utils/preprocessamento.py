@@ -0,0 +1,70 @@
+"""Normalização de texto única para o treino (modelo.py) e para o servidor (página 1).
+
+Mesmo resultado do antigo modelo.preprocess: minúsculas, sem dígitos nem pontuação
+ASCII, tokens do word_tokenize sem stopwords e sem palavras de até 2 letras. As
+stopwords, a tabela de tradução e as regex são montadas uma única vez.
+
+Sem pontuação ASCII o texto não tem fim de frase, então o word_tokenize se reduz
+ao tokenizador de palavras do NLTK, que por sua vez só difere de str.split() em
+aspas tipográficas e em algumas contrações do inglês; só os textos com esses
+casos passam por ele.
+"""
+import os
+import re
+import string
+from functools import lru_cache
+from multiprocessing import get_context
+
+# Incrementar sempre que o resultado de `preprocessar` mudar: a versão vai junto dos
+# embeddings gerados e invalida o cache de embeddings e o cache de currículos
+VERSAO_PREPROCESSAMENTO = 1
+# A partir deste número de textos compensa subir um pool de processos
+MINIMO_LOTE_PARALELO = 20_000
+
+# Uma passada remove dígitos e pontuação ASCII (str.translate é lento em texto não-ASCII)
+_DIGITOS_E_PONTUACAO = re.compile(r"[\d" + re.escape(string.punctuation) + "]+")
+# O que o tokenizador do NLTK ainda separaria depois dessa limpeza
+_ASPAS_TIPOGRAFICAS = frozenset("«“‘„»”’")
+_CONTRACOES_INGLES = ("cannot", "gimme", "gonna", "gotta", "lemme", "wanna")
+
+
+# O nltk só é importado no primeiro texto: o pacote carrega o sklearn junto, o que
+# atrasaria a abertura da página 1
+@lru_cache(maxsize=None)
+def _tokenizador():
+    from nltk.tokenize.destructive import NLTKWordTokenizer
+    return NLTKWordTokenizer()
+
+
+@lru_cache(maxsize=None)
+def stopwords_portugues():
+    import nltk
+    try:
+        nltk.data.find("corpora/stopwords")
+    except LookupError:
+        nltk.download("stopwords")
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words("portuguese"))
+
+
+def preprocessar(texto):
+    """Texto normalizado para o modelo de embeddings"""
+    texto = _DIGITOS_E_PONTUACAO.sub("", texto.lower())
+    if (not _ASPAS_TIPOGRAFICAS.isdisjoint(texto)
+            or any(contracao in texto for contracao in _CONTRACOES_INGLES)):
+        tokens = _tokenizador().tokenize(texto)
+    else:
+        tokens = texto.split()
+    stop_words = stopwords_portugues()
+    return " ".join(token for token in tokens if len(token) > 2 and token not in stop_words)
+
+
+def preprocessar_lote(textos, processos=None):
+    """`preprocessar` de cada texto, na ordem; corpora grandes usam vários processos"""
+    textos = list(textos)
+    processos = processos or os.cpu_count() or 1
+    if processos == 1 or len(textos) < MINIMO_LOTE_PARALELO:
+        return [preprocessar(texto) for texto in textos]
+
+    with get_context("spawn").Pool(processos) as pool:
+        return pool.map(preprocessar, textos, chunksize=max(1, len(textos) // (8 * processos)))
@@ -0,0 +1,100 @@
+"""Registro único, por processo do servidor, dos recursos pesados (catálogo de vagas e
+modelo de embeddings).
+
+Cada recurso é carregado uma única vez: quem pede um recurso que ainda está sendo
+carregado espera por esse carregamento em vez de começar outro. O aquecimento
+(carregar tudo e fazer uma codificação e uma pontuação de teste) roda em uma
+thread de fundo desde a primeira execução do app, então o primeiro CV já encontra
+o tokenizer e o modelo prontos.
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+
+class RegistroModelos:
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._futuros = {}
+        self._tempos = {}
+
+    def _reservar(self, nome, repetir_falha):
+        """Futuro do recurso e se quem chamou deve carregá-lo (nenhum carregamento em
+        andamento ou concluído; um que falhou só se `repetir_falha`)"""
+        with self._trava:
+            futuro = self._futuros.get(nome)
+            if futuro is not None and not (
+                    repetir_falha and futuro.done() and futuro.exception() is not None):
+                return futuro, False
+            futuro = self._futuros[nome] = Future()
+            return futuro, True
+
+    def _carregar(self, nome, carregar, futuro):
+        inicio = time.perf_counter()
+        try:
+            futuro.set_result(carregar())
+        except BaseException as erro:
+            futuro.set_exception(erro)
+            print(f"Falha ao carregar {nome}: {erro!r}")
+        finally:
+            self._tempos[nome] = time.perf_counter() - inicio
+
+    def obter(self, nome, carregar):
+        """Recurso `nome`: o já carregado, o que está sendo carregado (espera por ele)
+        ou, se nenhum carregamento começou ou o último falhou, `carregar()` nesta thread"""
+        futuro, carregar_aqui = self._reservar(nome, repetir_falha=True)
+        if carregar_aqui:
+            self._carregar(nome, carregar, futuro)
+        return futuro.result()
+
+    def iniciar(self, nome, carregar):
+        """Começa a carregar `nome` em uma thread de fundo, se ainda não começou. Uma
+        falha não é repetida aqui (a cada execução do script seria um novo aquecimento):
+        fica no estado até alguém pedir o recurso por `obter`"""
+        futuro, carregar_aqui = self._reservar(nome, repetir_falha=False)
+        if carregar_aqui:
+            threading.Thread(target=self._carregar, args=(nome, carregar, futuro),
+                             name=f"carregar-{nome}", daemon=True).start()
+        return futuro
+
+    def pronto(self, nome):
+        futuro = self._futuros.get(nome)
+        return futuro is not None and futuro.done() and futuro.exception() is None
+
+    def estado(self):
+        """nome -> (situação, segundos de carga ou None, erro ou None); situação é
+        "carregando", "pronto" ou "erro" """
+        with self._trava:
+            futuros = dict(self._futuros)
+        estado = {}
+        for nome, futuro in futuros.items():
+            if not futuro.done():
+                estado[nome] = ("carregando", None, None)
+            elif futuro.exception() is not None:
+                estado[nome] = ("erro", self._tempos.get(nome), futuro.exception())
+            else:
+                estado[nome] = ("pronto", self._tempos.get(nome), None)
+        return estado
+
+
+registro = RegistroModelos()
+
+
+def _aquecer():
+    from aplicacao.utils.predicao_vagas import aquecer
+    from aplicacao.utils.servico_inferencia import ServicoIndisponivel, cliente_inferencia
+    # Com o serviço de inferência catálogo e modelo ficam lá; a réplica só pede as opções
+    # de filtro e carrega os seus na primeira falha do serviço
+    if cliente_inferencia is not None:
+        try:
+            cliente_inferencia.valores_filtros()
+        except ServicoIndisponivel:
+            pass
+    else:
+        aquecer()
+
+
+def iniciar_aquecimento():
+    """Começa, só na primeira chamada do processo, o carregamento e o aquecimento dos
+    recursos da página 1 em segundo plano"""
+    return registro.iniciar("aquecimento", _aquecer)
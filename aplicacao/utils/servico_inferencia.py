@@ -0,0 +1,267 @@
+"""Serviço de inferência fora do processo do Streamlit, compartilhado pelas réplicas do app.
+
+Cada réplica do servidor carregaria seu próprio modelo de embeddings, catálogo e
+ensemble. Com o serviço, um único processo é dono deles (as réplicas só os carregam
+se o serviço falhar) e atende as réplicas por
+um socket Unix ("unix:/caminho/do/socket") ou TCP local ("127.0.0.1:8765"). O
+protocolo é uma mensagem JSON por linha, nos dois sentidos:
+
+    {"operacao": "codificar", "texto": ...}        -> {"vetor": [...]}
+    {"operacao": "recomendar", "vetor": [...], "top_n": 5, "filtros": {...}}
+                                                   -> {"recomendacoes": {"columns": [...], "data": [...]}}
+    {"operacao": "filtros"}                        -> {"valores": {"estado": [...], ...}}
+    {"operacao": "vagas", "ids": [...]}            -> {"vagas": {"<id_vaga>": {...}}}
+    {"operacao": "estado"}                         -> {"versao_modelo": ..., "executor": {...}, "lotes": {...}}
+
+Erros voltam como {"erro": "ocupado" | "falha", "mensagem": ...}. Dentro do serviço
+as chamadas passam pelo mesmo executor e pelos mesmos lotes dinâmicos da página 1,
+agora juntando CVs de todas as réplicas.
+
+Executar a partir da raiz do projeto (endereço padrão em configuracao.SERVICO_INFERENCIA):
+    python -m aplicacao.utils.servico_inferencia [endereco]
+"""
+import asyncio
+import functools
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from aplicacao.utils import configuracao
+from aplicacao.utils.executor_inferencia import ServidorOcupado
+
+ENDERECO_PADRAO = "127.0.0.1:8765"
+# Maior mensagem aceita (um CV muito longo ainda cabe com folga)
+LIMITE_MENSAGEM = 64 * 2**20
+# Conexões atendidas ao mesmo tempo; o trabalho pesado é limitado pelo executor de inferência
+CONEXOES_SIMULTANEAS = 64
+# Depois de uma falha, o cliente passa esses segundos sem tentar o serviço
+PAUSA_APOS_FALHA = 30.0
+# Limite das consultas de estado/métricas, que não passam pela fila de inferência
+TIMEOUT_ESTADO = 2.0
+
+
+class ServicoIndisponivel(ConnectionError):
+    """O serviço de inferência recusou a conexão, caiu ou não respondeu a tempo"""
+
+
+def interpretar_endereco(endereco):
+    """(família do socket, destino) de "unix:/caminho" ou "host:porta" """
+    if endereco.startswith("unix:"):
+        return socket.AF_UNIX, endereco[len("unix:"):]
+    host, _, porta = endereco.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(porta))
+
+
+def _valor_json(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    raise TypeError(f"{type(valor).__name__} não é serializável em JSON")
+
+
+def codificar_mensagem(mensagem):
+    return json.dumps(mensagem, ensure_ascii=False, default=_valor_json).encode("utf-8") + b"\n"
+
+
+# # == == == == == == == == == == == == == == == == == == == == == == ==
+# # CLIENTE (processos do Streamlit)
+# # == == == == == == == == == == == == == == == == == == == == == == ==
+
+
+class ClienteInferencia:
+    """Cliente do serviço, com uma conexão persistente por thread (sessão do Streamlit)"""
+
+    def __init__(self, endereco, timeout=60.0):
+        self.endereco = endereco
+        self.timeout = timeout
+        self._local = threading.local()
+        self._ultima_falha = None
+        self._valores_filtros = None
+
+    def disponivel(self):
+        """Falso durante PAUSA_APOS_FALHA segundos depois de uma falha de comunicação"""
+        falha = self._ultima_falha
+        return falha is None or time.monotonic() - falha >= PAUSA_APOS_FALHA
+
+    def _conectar(self):
+        familia, destino = interpretar_endereco(self.endereco)
+        conexao = socket.socket(familia, socket.SOCK_STREAM)
+        conexao.settimeout(self.timeout)
+        try:
+            conexao.connect(destino)
+        except OSError:
+            conexao.close()
+            raise
+        self._local.conexao = conexao
+        self._local.leitor = conexao.makefile("rb")
+
+    def _fechar(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is not None:
+            self._local.leitor.close()
+            conexao.close()
+        self._local.conexao = None
+
+    def _trocar_mensagens(self, pedido):
+        self._local.conexao.sendall(codificar_mensagem(pedido))
+        linha = self._local.leitor.readline()
+        if not linha:
+            raise ConnectionResetError("conexão fechada pelo serviço")
+        return json.loads(linha)
+
+    def pedir(self, pedido, timeout=None):
+        """Resposta do serviço a `pedido` em até `timeout` segundos (padrão: o do cliente);
+        ServicoIndisponivel se não houver resposta, ServidorOcupado se a fila do serviço
+        estiver cheia"""
+        if not self.disponivel():
+            raise ServicoIndisponivel(f"{self.endereco} falhou há menos de {PAUSA_APOS_FALHA:.0f}s")
+        # Uma conexão reaproveitada pode ter sido fechada (p.ex. o serviço reiniciou):
+        # nesse caso tenta uma vez com uma conexão nova
+        for _ in range(2):
+            reaproveitada = getattr(self._local, "conexao", None) is not None
+            try:
+                if not reaproveitada:
+                    self._conectar()
+                self._local.conexao.settimeout(timeout or self.timeout)
+                resposta = self._trocar_mensagens(pedido)
+                break
+            except OSError as erro:
+                self._fechar()
+                if reaproveitada and not isinstance(erro, socket.timeout):
+                    continue
+                self._ultima_falha = time.monotonic()
+                raise ServicoIndisponivel(f"{self.endereco}: {erro!r}") from erro
+        self._ultima_falha = None
+        if resposta.get("erro") == "ocupado":
+            raise ServidorOcupado(resposta["mensagem"])
+        if "erro" in resposta:
+            raise RuntimeError(f"Serviço de inferência: {resposta['mensagem']}")
+        return resposta
+
+    def codificar(self, cv_text):
+        """Embedding do currículo (1 x dimensão), como predicao_vagas.codificar_cv"""
+        resposta = self.pedir({"operacao": "codificar", "texto": cv_text})
+        return np.asarray(resposta["vetor"], dtype=np.float32)[None, :]
+
+    def recomendar(self, cv_vec, top_n=5, filtros=None):
+        """Recomendações para um embedding, como predicao_vagas.predict_jobs_for_cv"""
+        resposta = self.pedir({"operacao": "recomendar", "vetor": np.asarray(cv_vec)[0],
+                               "top_n": top_n, "filtros": filtros})
+        recomendacoes = resposta["recomendacoes"]
+        return pd.DataFrame(recomendacoes["data"], columns=recomendacoes["columns"])
+
+    def valores_filtros(self):
+        """Valores de cada atributo de filtro no catálogo do serviço, pedidos uma vez por
+        processo (o catálogo do serviço só muda quando ele reinicia)"""
+        if self._valores_filtros is None:
+            self._valores_filtros = self.pedir({"operacao": "filtros"}, TIMEOUT_ESTADO)["valores"]
+        return self._valores_filtros
+
+    def vagas(self, ids):
+        """Registros (como no vagas.json) das vagas `ids` no catálogo do serviço"""
+        return self.pedir({"operacao": "vagas", "ids": list(ids)}, TIMEOUT_ESTADO)["vagas"]
+
+    def estado(self, timeout=TIMEOUT_ESTADO):
+        return self.pedir({"operacao": "estado"}, timeout)
+
+    def metricas(self, timeout=TIMEOUT_ESTADO):
+        """Métricas do executor e dos lotes do serviço, como predicao_vagas.metricas_inferencia"""
+        estado = self.estado(timeout)
+        return estado["executor"], estado["lotes"]
+
+
+# Um cliente por processo quando o serviço está configurado (None = inferência local)
+cliente_inferencia = (ClienteInferencia(configuracao.SERVICO_INFERENCIA,
+                                        configuracao.SERVICO_INFERENCIA_TIMEOUT)
+                      if configuracao.SERVICO_INFERENCIA else None)
+
+
+# # == == == == == == == == == == == == == == == == == == == == == == ==
+# # SERVIDOR
+# # == == == == == == == == == == == == == == == == == == == == == == ==
+
+
+def responder(pedido):
+    """Resposta a um pedido, calculada com os modelos deste processo"""
+    from aplicacao.utils import predicao_vagas
+
+    operacao = pedido.get("operacao")
+    if operacao == "codificar":
+        return {"vetor": predicao_vagas.codificar_cv(pedido["texto"])[0]}
+    if operacao == "recomendar":
+        cv_vec = None
+        if pedido.get("vetor") is not None:
+            cv_vec = np.asarray(pedido["vetor"], dtype=np.float32)[None, :]
+        recomendacoes = predicao_vagas.executor_inferencia.executar(
+            predicao_vagas.predict_jobs_for_cv, pedido.get("texto", ""), pedido.get("top_n", 5),
+            pedido.get("filtros"), cv_vec=cv_vec)
+        return {"recomendacoes": recomendacoes.to_dict(orient="split", index=False)}
+    if operacao == "filtros":
+        return {"valores": predicao_vagas.valores_filtros()}
+    if operacao == "vagas":
+        jobs = predicao_vagas.obter_catalogo().jobs
+        return {"vagas": {jid: jobs.get(jid, {}) for jid in pedido["ids"]}}
+    if operacao == "estado":
+        executor, lotes = predicao_vagas.metricas_inferencia()
+        return {"versao_modelo": predicao_vagas.VERSAO_MODELO_CV, "executor": executor, "lotes": lotes}
+    raise ValueError(f"Operação desconhecida: {operacao!r}")
+
+
+async def _atender(leitor, escritor, pool):
+    """Atende os pedidos de uma conexão, um por vez, até o cliente fechá-la"""
+    loop = asyncio.get_running_loop()
+    try:
+        while linha := await leitor.readline():
+            try:
+                resposta = await loop.run_in_executor(pool, responder, json.loads(linha))
+            except ServidorOcupado as erro:
+                resposta = {"erro": "ocupado", "mensagem": str(erro)}
+            except Exception as erro:
+                resposta = {"erro": "falha", "mensagem": f"{type(erro).__name__}: {erro}"}
+            escritor.write(codificar_mensagem(resposta))
+            await escritor.drain()
+    except (ConnectionError, ValueError):
+        # Cliente caiu no meio da conversa ou mandou uma linha maior que LIMITE_MENSAGEM
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir(endereco):
+    familia, destino = interpretar_endereco(endereco)
+    pool = ThreadPoolExecutor(max_workers=CONEXOES_SIMULTANEAS, thread_name_prefix="servico")
+    atender = functools.partial(_atender, pool=pool)
+    if familia == socket.AF_UNIX:
+        # Socket deixado por uma execução anterior
+        if os.path.exists(destino) and stat.S_ISSOCK(os.stat(destino).st_mode):
+            os.unlink(destino)
+        servidor = await asyncio.start_unix_server(atender, destino, limit=LIMITE_MENSAGEM)
+    else:
+        servidor = await asyncio.start_server(atender, *destino, limit=LIMITE_MENSAGEM)
+    print(f"Serviço de inferência ouvindo em {endereco}")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main(endereco=None):
+    from aplicacao.utils.predicao_vagas import aquecer
+
+    endereco = endereco or configuracao.SERVICO_INFERENCIA or ENDERECO_PADRAO
+    # Modelos carregados e aquecidos antes de aceitar conexões
+    inicio = time.perf_counter()
+    aquecer()
+    print(f"Modelos carregados e aquecidos em {time.perf_counter() - inicio:.1f}s")
+    asyncio.run(servir(endereco))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
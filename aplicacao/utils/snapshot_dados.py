@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+PASTA_SNAPSHOT = 'aplicacao/dados/snapshot'
+META_SNAPSHOT = os.path.join(PASTA_SNAPSHOT, 'meta.json')
+# Incrementar quando o formato dos DataFrames salvos mudar
+VERSAO_SNAPSHOT = 2
+# Colunas de texto com poucos valores distintos viram categóricas
+LIMITE_CATEGORIA = 0.5
+
+
+def impressao_digital(caminhos):
+    """Tamanho e mtime de cada arquivo de origem, usados para invalidar o snapshot"""
+    digital = {}
+    for caminho in caminhos:
+        stat = os.stat(caminho)
+        digital[os.path.basename(caminho)] = [stat.st_size, stat.st_mtime_ns]
+    return digital
+
+
+def tipar_colunas(df):
+    """Converte colunas de texto para tipos que o formato colunar armazena bem"""
+    df = df.copy()
+    for coluna in df.columns:
+        if df[coluna].dtype != object:
+            continue
+        valores = df[coluna].dropna()
+        if not valores.map(lambda v: isinstance(v, str)).all():
+            # Valores mistos (listas, números) são guardados como texto
+            df[coluna] = df[coluna].map(lambda v: v if v is None or isinstance(v, str) else str(v))
+            # Listas e dicionários não são hasheáveis: a cardinalidade é a do texto
+            valores = df[coluna].dropna()
+        if len(valores) and valores.nunique() <= LIMITE_CATEGORIA * len(valores):
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def _caminho(nome):
+    return os.path.join(PASTA_SNAPSHOT, f'{nome}.feather')
+
+
+def ler_meta_snapshot():
+    try:
+        with open(META_SNAPSHOT, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def carregar_snapshot(nomes, digital):
+    """Lê os DataFrames do snapshot se ele corresponder às fontes atuais, senão None"""
+    meta = ler_meta_snapshot()
+    if meta is None:
+        return None
+
+    if meta.get('versao') != VERSAO_SNAPSHOT or meta.get('fontes') != digital:
+        return None
+    if not all(os.path.exists(_caminho(nome)) for nome in nomes):
+        return None
+
+    inicio = time.perf_counter()
+    frames = {nome: pd.read_feather(_caminho(nome)) for nome in nomes}
+    print(f"Snapshot de {', '.join(nomes)} carregado em {time.perf_counter() - inicio:.3f}s.")
+    return frames
+
+
+def salvar_snapshot(frames, digital, versoes_registros=None):
+    """Grava os DataFrames em Arrow IPC (feather) e, por último, o meta que os valida.
+
+    `versoes_registros` guarda a versão de cada registro alterado por deltas
+    (ver ingestao_incremental); um snapshot refeito dos JSONs tem só as dos deltas reaplicados.
+    """
+    os.makedirs(PASTA_SNAPSHOT, exist_ok=True)
+    inicio = time.perf_counter()
+    for nome, df in frames.items():
+        fd, tmp = tempfile.mkstemp(dir=PASTA_SNAPSHOT, suffix='.tmp')
+        os.close(fd)
+        df.reset_index(drop=True).to_feather(tmp)
+        os.replace(tmp, _caminho(nome))
+
+    fd, tmp = tempfile.mkstemp(dir=PASTA_SNAPSHOT, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({'versao': VERSAO_SNAPSHOT, 'fontes': digital,
+                   'versoes_registros': versoes_registros or {}}, f)
+    os.replace(tmp, META_SNAPSHOT)
+    print(f"Snapshot de {', '.join(frames)} gravado em {time.perf_counter() - inicio:.3f}s.")
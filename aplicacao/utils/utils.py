@@ -183,4 +183,13 @@ def style():
         </style>
         """,
         unsafe_allow_html=True
-    )
\ No newline at end of file
+    )
+
+
+def contar_presentes(coluna):
+    """Contagem por valor só dos valores presentes: em colunas categóricas o value_counts
+    traz todas as categorias, e o plotly agrupa pelas categorias, mesmo as ausentes"""
+    contagem = coluna.value_counts()
+    contagem = contagem[contagem > 0]
+    contagem.index = contagem.index.astype(object)
+    return contagem
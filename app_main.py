@@ -2,12 +2,12 @@ from PIL import Image
 import streamlit as st
 import sys
 st.set_page_config(page_title="MVP IA - Recrutamento Decision", layout="wide")
-from aplicacao.operacoes.pagina_1 import predicao_1
-from aplicacao.operacoes.pagina_2 import visao_geral_02
-from aplicacao.operacoes.pagina_3 import analise_vaga_03
-from aplicacao.operacoes.pagina_4 import analise_candidato_04
-
-from aplicacao.utils.preparar_candidatos_df import preparar_candidatos_df
+# As páginas são importadas só quando selecionadas: a página 1 traz torch e o
+# modelo de embeddings, a base de candidatos traz sklearn, e nenhuma das outras
+# páginas precisa deles
+from aplicacao.utils import configuracao
+from aplicacao.utils.registro_modelos import iniciar_aquecimento, registro
+from aplicacao.utils.servico_inferencia import cliente_inferencia
 from aplicacao.utils.utils import style
 
 # Corrige possível erro com torch.classes
@@ -34,27 +34,82 @@ pagina = st.sidebar.selectbox("Selecione a página: ", [
     "4. Análise de Candidatos"
 ], key="menu_principal")
 
-
-@st.cache_data(show_spinner="Carregando dados e preparando base...")
+# Catálogo e modelo da página 1 começam a carregar em segundo plano na primeira
+# execução do processo, qualquer que seja a página aberta
+if configuracao.AQUECER_MODELOS:
+    iniciar_aquecimento()
+
+RECURSOS = {"catalogo": "Vagas", "modelo_embeddings": "Modelo de embeddings",
+            "aquecimento": "Aquecimento"}
+SITUACOES = {"carregando": "⏳ carregando", "pronto": "✅ pronto", "erro": "⚠️ erro"}
+
+
+def mostrar_prontidao():
+    estado = registro.estado()
+    for nome, rotulo in RECURSOS.items():
+        situacao, segundos, erro = estado.get(nome, ("aguardando", None, None))
+        texto = SITUACOES.get(situacao, "aguardando o primeiro uso")
+        if segundos is not None:
+            texto += f" ({segundos:.1f}s)"
+        st.caption(f"**{rotulo}:** {texto}")
+        if erro is not None:
+            # O aquecimento não é repetido a cada execução; a página 1 tenta de novo ao usar o recurso
+            st.caption(f"{type(erro).__name__}: {erro}. Nova tentativa no próximo uso da página 1.")
+    if cliente_inferencia is not None:
+        texto = ("✅ em uso" if cliente_inferencia.disponivel()
+                 else "⚠️ indisponível, usando o modelo local")
+        st.caption(f"**Serviço de inferência** ({cliente_inferencia.endereco}): {texto}")
+
+
+def carregando():
+    return any(situacao == "carregando" for situacao, _, _ in registro.estado().values())
+
+
+def acompanhar_prontidao():
+    mostrar_prontidao()
+    # O run_every vale enquanto o fragmento existir: terminado o carregamento, uma
+    # execução completa do script o troca pelo quadro estático
+    if not carregando():
+        st.rerun()
+
+
+with st.sidebar:
+    st.markdown("**Modelos**")
+    # Enquanto algo carrega, o quadro se atualiza sozinho
+    if carregando():
+        st.experimental_fragment(acompanhar_prontidao, run_every=2)()
+    else:
+        mostrar_prontidao()
+
+
+# Uma base por processo, compartilhada por todas as sessões e execuções: o cache_data
+# devolveria uma cópia desserializada (DataFrames e prospects_json inteiro) a cada
+# interação. As páginas só leem esses objetos; filtros e colunas novas vão em cópias
+@st.cache_resource(show_spinner="Carregando dados e preparando base...")
 def carregar_dados():
+    from aplicacao.utils.preparar_candidatos_df import preparar_candidatos_df
     vagas_df, prospects_df, prospects_json = preparar_candidatos_df()
     return vagas_df, prospects_df, prospects_json
 
-# Carregamento e roteamento
+# Carregamento e roteamento (a base só é carregada pelas páginas que a usam)
 try:
-    vagas_df, prospects_df, prospects_json = carregar_dados()
-
     if pagina == "1. Predição de Aprovação":
+        from aplicacao.operacoes.pagina_1 import predicao_1
         predicao_1()
 
     elif pagina == "2. Visão Geral":
+        from aplicacao.operacoes.pagina_2 import visao_geral_02
         visao_geral_02()
 
     elif pagina == "3. Análise de Vagas":
+        from aplicacao.operacoes.pagina_3 import analise_vaga_03
+        vagas_df, prospects_df, prospects_json = carregar_dados()
         analise_vaga_03(vagas_df)
 
     elif pagina == "4. Análise de Candidatos":
-        analise_candidato_04(prospects_json)
+        from aplicacao.operacoes.pagina_4 import analise_candidato_04
+        vagas_df, prospects_df, prospects_json = carregar_dados()
+        analise_candidato_04(prospects_df)
 
 except Exception as e:
     st.error(f"Erro ao carregar dados ou renderizar a página: {e}")
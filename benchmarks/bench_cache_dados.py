@@ -0,0 +1,61 @@
+"""Custo, a cada execução do script, de obter a base das páginas 3 e 4 (vagas_df,
+prospects_df e prospects_json) com st.cache_data, que devolve uma cópia
+desserializada a cada chamada, versus st.cache_resource, que devolve sempre os
+mesmos objetos.
+
+Cada decorador roda em um AppTest: a primeira execução monta a base; nas seguintes
+medimos o tempo da chamada e a memória alocada por ela (tracemalloc).
+
+Executar a partir da raiz do projeto, com os dados em aplicacao/dados:
+    python -m benchmarks.bench_cache_dados
+"""
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+EXECUCOES = 5
+
+_SCRIPT = """
+import time
+import tracemalloc
+import streamlit as st
+from aplicacao.utils.preparar_candidatos_df import preparar_candidatos_df
+
+@st.{decorador}
+def carregar_dados():
+    return preparar_candidatos_df()
+
+medicoes = st.session_state.setdefault("medicoes", [])
+medir_memoria = len(medicoes) % 2 == 1
+if medir_memoria:
+    tracemalloc.start()
+inicio = time.perf_counter()
+dados = carregar_dados()
+duracao = time.perf_counter() - inicio
+pico = tracemalloc.get_traced_memory()[1] if medir_memoria else None
+tracemalloc.stop()
+medicoes.append((duracao, pico, dados[0] is st.session_state.get("anterior")))
+st.session_state["anterior"] = dados[0]
+"""
+
+
+def medir(decorador):
+    at = AppTest.from_string(_SCRIPT.format(decorador=decorador), default_timeout=600)
+    for _ in range(1 + 2 * EXECUCOES):
+        at.run()
+    medicoes = at.session_state["medicoes"][1:]
+    tempos = [duracao for duracao, pico, _ in medicoes if pico is None]
+    picos = [pico for _, pico, _ in medicoes if pico is not None]
+    reaproveitados = sum(mesmo for _, _, mesmo in medicoes)
+    return np.median(tempos) * 1000, np.median(picos) / 2**20, reaproveitados, len(medicoes)
+
+
+def main():
+    print(f"{EXECUCOES} execuções depois da primeira")
+    print(f"{'decorador':>14} | {'chamada (ms)':>12} | {'alocado (MB)':>12} | {'mesmo objeto':>12}")
+    for decorador in ("cache_data", "cache_resource"):
+        tempo, alocado, reaproveitados, chamadas = medir(decorador)
+        print(f"{decorador:>14} | {tempo:12.1f} | {alocado:12.1f} | {f'{reaproveitados}/{chamadas}':>12}")
+
+
+if __name__ == "__main__":
+    main()
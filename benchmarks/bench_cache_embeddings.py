@@ -0,0 +1,65 @@
+"""Reconstrução de embeddings das vagas com o cache por texto versus codificação completa.
+
+Simula uma atualização em que uma fração das vagas muda de texto, confere que os
+vetores vindos do cache batem com os de uma reconstrução completa e mostra acertos,
+faltas e o tempo de codificação economizado.
+
+Executar a partir da raiz do projeto, com aplicacao/dados/vagas.json presente:
+    python -m benchmarks.bench_cache_embeddings [modelo] [fracao_alterada]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from aplicacao.utils.cache_embeddings import CacheEmbeddings
+from aplicacao.utils.preprocessamento import VERSAO_PREPROCESSAMENTO, preprocessar_lote
+from modelo import NOME_MODELO_EMBEDDINGS, extract_job_requirements
+
+# Diferença aceitável entre lotes diferentes (padding muda a ordem das somas em float32)
+TOLERANCIA = 1e-5
+
+
+def main(nome_modelo=NOME_MODELO_EMBEDDINGS, fracao_alterada=0.01):
+    with open("aplicacao/dados/vagas.json", encoding="utf-8") as f:
+        jobs = json.load(f)
+    textos = preprocessar_lote(extract_job_requirements(job) for job in jobs.values())
+    model = SentenceTransformer(nome_modelo)
+
+    rng = np.random.default_rng(42)
+    alterados = set(rng.choice(len(textos), max(1, int(len(textos) * fracao_alterada)), replace=False))
+    textos_novos = [t + " atualizada" if i in alterados else t for i, t in enumerate(textos)]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "cache.npz")
+        cache = CacheEmbeddings(nome_modelo, VERSAO_PREPROCESSAMENTO, caminho)
+        cache.codificar(textos, model.encode)
+        cache.salvar()
+
+        inicio = time.perf_counter()
+        completo = model.encode(textos_novos)
+        t_completo = time.perf_counter() - inicio
+
+        cache = CacheEmbeddings(nome_modelo, VERSAO_PREPROCESSAMENTO, caminho)
+        inicio = time.perf_counter()
+        incremental = cache.codificar(textos_novos, model.encode)
+        t_incremental = time.perf_counter() - inicio
+
+    diferenca = np.abs(completo - incremental).max()
+    print(f"{len(textos)} vagas, {len(alterados)} alteradas")
+    print(f"acertos {cache.acertos}, faltas {cache.faltas}")
+    print(f"reconstrução completa {t_completo:.2f}s, com cache {t_incremental:.2f}s "
+          f"({t_completo - t_incremental:.2f}s economizados)")
+    print(f"diferença máxima para a reconstrução completa: {diferenca:.1e}")
+    if diferenca > TOLERANCIA:
+        raise SystemExit("Embeddings do cache divergem da reconstrução completa.")
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    main(argumentos[0] if argumentos else NOME_MODELO_EMBEDDINGS,
+         float(argumentos[1]) if len(argumentos) > 1 else 0.01)
@@ -0,0 +1,48 @@
+"""Tempo e memória residente do fluxo padrão de carregamento (preparar_candidatos_df),
+com applicants.json sob demanda versus carregado por completo.
+
+Cada cenário roda em um processo novo para o pico de RSS não se misturar.
+Executar a partir da raiz do projeto, com aplicacao/dados.zip presente:
+    python -m benchmarks.bench_carregar_base
+"""
+import json
+import subprocess
+import sys
+
+CENARIO = """
+import json, resource, time
+inicio = time.perf_counter()
+from aplicacao.utils.preparar_candidatos_df import preparar_candidatos_df
+from aplicacao.utils import carregar_dados
+vagas_df, prospects_df, prospects_json = preparar_candidatos_df()
+if {forcar_applicants}:
+    len(carregar_dados.ler_json_dados('applicants.json'))
+print(json.dumps({{
+    "segundos": time.perf_counter() - inicio,
+    "rss_pico_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+
+def medir(forcar_applicants):
+    saida = subprocess.run(
+        [sys.executable, "-c", CENARIO.format(forcar_applicants=forcar_applicants)],
+        capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    # Primeira execução só aquece a extração e o snapshot
+    medir(False)
+    ansioso = medir(True)
+    preguicoso = medir(False)
+
+    print(f"{'cenário':>22} | {'tempo (s)':>9} | {'RSS pico (MB)':>13}")
+    for nome, r in [("applicants completo", ansioso), ("applicants sob demanda", preguicoso)]:
+        print(f"{nome:>22} | {r['segundos']:9.2f} | {r['rss_pico_mb']:13.0f}")
+    print(f"Economia: {ansioso['segundos'] - preguicoso['segundos']:.2f}s e "
+          f"{ansioso['rss_pico_mb'] - preguicoso['rss_pico_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
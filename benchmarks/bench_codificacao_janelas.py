@@ -0,0 +1,61 @@
+"""Latência da codificação de um CV conforme o tamanho: model.encode (truncado)
+versus codificar_em_janelas, e vários CVs em uma única chamada.
+
+Executar a partir da raiz do projeto:
+    python -m benchmarks.bench_codificacao_janelas [modelo]
+"""
+import sys
+import time
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from aplicacao.utils.codificacao_janelas import codificar_em_janelas
+from modelo import NOME_MODELO_EMBEDDINGS
+
+PALAVRAS = ("experiência desenvolvimento sistemas python java sql cloud gestão projetos "
+            "equipe análise dados infraestrutura suporte implantação requisitos clientes "
+            "integração serviços banco relatórios automação testes").split()
+TAMANHOS = [50, 200, 500, 1000, 2000, 5000]
+
+
+def cv_sintetico(palavras, rng):
+    return " ".join(rng.choice(PALAVRAS, palavras))
+
+
+def cronometrar(func, repeticoes=5):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return float(np.median(tempos)) * 1000
+
+
+def main(nome_modelo=NOME_MODELO_EMBEDDINGS):
+    rng = np.random.default_rng(42)
+    model = SentenceTransformer(nome_modelo, device="cpu")
+    tamanho_janela = model.max_seq_length - model.tokenizer.num_special_tokens_to_add(pair=False)
+    model.encode(["aquecimento"])
+
+    print(f"{'palavras':>8} | {'tokens':>6} | {'janelas':>7} | {'truncado (ms)':>13} | "
+          f"{'janelas (ms)':>12} | {'máx. 16 (ms)':>12}")
+    for palavras in TAMANHOS:
+        cv = cv_sintetico(palavras, rng)
+        tokens = len(model.tokenizer(cv, add_special_tokens=False, verbose=False)["input_ids"])
+        janelas = max(1, -(-tokens // tamanho_janela))
+        t_truncado = cronometrar(lambda: model.encode([cv]))
+        t_janelas = cronometrar(lambda: codificar_em_janelas(model, [cv]))
+        t_limitado = cronometrar(lambda: codificar_em_janelas(model, [cv], max_janelas=16))
+        print(f"{palavras:>8} | {tokens:>6} | {janelas:>7} | {t_truncado:13.1f} | "
+              f"{t_janelas:12.1f} | {t_limitado:12.1f}")
+
+    cvs = [cv_sintetico(1000, rng) for _ in range(8)]
+    t_separados = cronometrar(lambda: [codificar_em_janelas(model, [cv]) for cv in cvs])
+    t_juntos = cronometrar(lambda: codificar_em_janelas(model, cvs))
+    print(f"8 CVs de 1000 palavras: {t_separados:.0f} ms em chamadas separadas, "
+          f"{t_juntos:.0f} ms em um único lote")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
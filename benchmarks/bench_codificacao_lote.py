@@ -0,0 +1,56 @@
+"""Vazão da codificação em lote (ordenada por tokens, multiprocessos) versus uma
+única chamada model.encode, como em modelo.gerar_embeddings_vagas.
+
+Executar a partir da raiz do projeto, com aplicacao/dados/vagas.json presente:
+    python -m benchmarks.bench_codificacao_lote [modelo] [repeticoes_do_corpus]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from aplicacao.utils.codificacao_lote import codificar_em_lote
+from aplicacao.utils.preprocessamento import preprocessar_lote
+from modelo import NOME_MODELO_EMBEDDINGS, extract_job_requirements
+
+
+def main(nome_modelo=NOME_MODELO_EMBEDDINGS, repeticoes=1):
+    with open("aplicacao/dados/vagas.json", encoding="utf-8") as f:
+        jobs = json.load(f)
+    textos = preprocessar_lote(extract_job_requirements(job) for job in jobs.values()) * repeticoes
+    # Embaralha para a comparação não herdar a ordem do arquivo
+    rng = np.random.default_rng(42)
+    textos = [textos[i] for i in rng.permutation(len(textos))]
+
+    model = SentenceTransformer(nome_modelo, device="cpu")
+    inicio = time.perf_counter()
+    referencia = model.encode(textos)
+    t_referencia = time.perf_counter() - inicio
+    del model
+
+    print(f"{len(textos)} textos, {os.cpu_count()} núcleos")
+    print(f"{'estratégia':>28} | {'tempo (s)':>9} | {'textos/s':>8}")
+    print(f"{'model.encode único':>28} | {t_referencia:9.2f} | {len(textos) / t_referencia:8.0f}")
+
+    contagens = sorted({1, os.cpu_count() or 1})
+    with tempfile.TemporaryDirectory() as pasta:
+        for processos in contagens:
+            caminho = os.path.join(pasta, f"emb_{processos}.npy")
+            inicio = time.perf_counter()
+            saida = codificar_em_lote(textos, nome_modelo, caminho, processos=processos)
+            duracao = time.perf_counter() - inicio
+            diferenca = np.abs(np.asarray(saida) - referencia).max()
+            del saida
+            rotulo = f"lote ordenado, {processos} proc."
+            print(f"{rotulo:>28} | {duracao:9.2f} | {len(textos) / duracao:8.0f}"
+                  f"   (diferença máx. {diferenca:.1e})")
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    main(argumentos[0] if argumentos else NOME_MODELO_EMBEDDINGS,
+         int(argumentos[1]) if len(argumentos) > 1 else 1)
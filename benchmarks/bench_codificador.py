@@ -0,0 +1,79 @@
+"""Backends do modelo de embeddings (codificador.BACKENDS): paridade dos scores de
+cosseno com o PyTorch float32 e latência, tempo de carga e memória de cada um.
+
+Cada backend roda em um processo próprio, para a memória medida ser só a dele.
+Executar a partir da raiz do projeto (aceita o caminho de um modelo local):
+    python -m benchmarks.bench_codificador [modelo]
+"""
+import resource
+import sys
+import time
+from multiprocessing import get_context
+
+import numpy as np
+
+from aplicacao.utils.codificador import BACKENDS
+from benchmarks.bench_codificacao_janelas import cronometrar, cv_sintetico
+from modelo import NOME_MODELO_EMBEDDINGS
+
+
+def _rss_atual_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def medir(nome_modelo, backend, cvs, vagas):
+    import torch
+    from aplicacao.utils.codificador import carregar_codificador
+
+    torch.set_num_threads(1)
+    rss_inicial = _rss_atual_mb()
+    inicio = time.perf_counter()
+    model = carregar_codificador(nome_modelo, backend)
+    carga = time.perf_counter() - inicio
+    model.encode(["aquecimento"])
+
+    return {
+        "carga_s": carga,
+        "rss_modelo_mb": _rss_atual_mb() - rss_inicial,
+        "um_cv_ms": cronometrar(lambda: model.encode(cvs[:1]), repeticoes=20),
+        "lote_ms": cronometrar(lambda: model.encode(vagas, batch_size=64), repeticoes=3),
+        "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "cvs": model.encode(cvs, normalize_embeddings=True),
+        "vagas": model.encode(vagas, normalize_embeddings=True),
+    }
+
+
+def main(nome_modelo=NOME_MODELO_EMBEDDINGS):
+    rng = np.random.default_rng(42)
+    cvs = [cv_sintetico(int(rng.integers(100, 400)), rng) for _ in range(50)]
+    vagas = [cv_sintetico(int(rng.integers(30, 150)), rng) for _ in range(256)]
+
+    resultados = {}
+    for backend in BACKENDS:
+        with get_context("spawn").Pool(1) as pool:
+            try:
+                resultados[backend] = pool.apply(medir, (nome_modelo, backend, cvs, vagas))
+            except ImportError as erro:
+                print(f"{backend}: indisponível ({erro})")
+
+    base = resultados["torch"]
+    sims_base = base["cvs"] @ base["vagas"].T
+    top_base = np.argsort(-sims_base, axis=1)[:, :5]
+    print(f"{len(cvs)} CVs x {len(vagas)} vagas, 1 thread")
+    print(f"{'backend':>10} | {'carga (s)':>9} | {'RSS modelo':>10} | {'pico RSS':>8} | "
+          f"{'1 CV (ms)':>9} | {'256 vagas (ms)':>14} | {'cos vs torch':>12} | "
+          f"{'|Δ sim| máx':>11} | {'top-5 igual':>11}")
+    for backend, r in resultados.items():
+        cos = np.sum(r["cvs"] * base["cvs"], axis=1)
+        sims = r["cvs"] @ r["vagas"].T
+        top = np.argsort(-sims, axis=1)[:, :5]
+        concordancia = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(top, top_base)])
+        print(f"{backend:>10} | {r['carga_s']:9.1f} | {r['rss_modelo_mb']:7.0f} MB | "
+              f"{r['pico_rss_mb']:5.0f} MB | {r['um_cv_ms']:9.1f} | {r['lote_ms']:14.0f} | "
+              f"{cos.min():12.4f} | {np.abs(sims - sims_base).max():11.4f} | "
+              f"{concordancia:11.1%}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,88 @@
+"""Teste de carga da inferência da página 1 com N sessões simultâneas: cada sessão é
+uma thread que envia CVs seguidos (codificação + recomendação sobre um catálogo
+sintético), chamando o modelo direto ou pelo ExecutorInferencia.
+
+Executar a partir da raiz do projeto (aceita o caminho de um modelo local):
+    python -m benchmarks.bench_executor_inferencia [modelo]
+"""
+import sys
+import threading
+import time
+
+import numpy as np
+
+from aplicacao.utils.artefato_vagas import normalizar
+from aplicacao.utils.codificador import carregar_codificador
+from aplicacao.utils.executor_inferencia import ExecutorInferencia, ServidorOcupado
+from aplicacao.utils.motor_recomendacao import CAMINHO_TABELA_ENSEMBLE, pontuar_tabela, recomendar
+from aplicacao.utils.preprocessamento import preprocessar
+from benchmarks.bench_codificacao_janelas import cv_sintetico
+from benchmarks.bench_indice_quantizado import metadados_minimos
+from modelo import NOME_MODELO_EMBEDDINGS
+
+SESSOES = [1, 4, 16]
+CVS_POR_SESSAO = 5
+N_VAGAS = 50_000
+
+
+def carga(executar, sessoes, cvs):
+    """Latências (s) das chamadas aceitas, recusas e duração total"""
+    latencias, recusas = [], []
+    trava = threading.Lock()
+
+    def sessao(indice):
+        for cv in cvs[indice]:
+            inicio = time.perf_counter()
+            try:
+                executar(cv)
+            except ServidorOcupado:
+                with trava:
+                    recusas.append(1)
+                continue
+            with trava:
+                latencias.append(time.perf_counter() - inicio)
+
+    threads = [threading.Thread(target=sessao, args=(i,)) for i in range(sessoes)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencias), len(recusas), time.perf_counter() - inicio
+
+
+def main(nome_modelo=NOME_MODELO_EMBEDDINGS):
+    rng = np.random.default_rng(42)
+    model = carregar_codificador(nome_modelo, "torch")
+    dimensao = model.get_sentence_embedding_dimension()
+    embeddings = normalizar(rng.standard_normal((N_VAGAS, dimensao), dtype=np.float32))
+    metadados = metadados_minimos(N_VAGAS)
+    tabela = np.load(CAMINHO_TABELA_ENSEMBLE)
+
+    def recomendar_cv(cv):
+        cv_vec = model.encode([preprocessar(cv)])
+        return recomendar(cv_vec, embeddings, metadados, lambda s: pontuar_tabela(s, tabela), 5)
+
+    recomendar_cv(cv_sintetico(300, rng))
+    executor = ExecutorInferencia()
+    print(f"{N_VAGAS} vagas, {CVS_POR_SESSAO} CVs por sessão, executor com "
+          f"{executor.trabalhadores} trabalhadores x {executor.threads_por_trabalhador} threads, "
+          f"fila {executor.tamanho_fila}")
+    print(f"{'sessões':>7} | {'modo':>8} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'p99 (ms)':>8} | "
+          f"{'CVs/s':>6} | {'recusados':>9}")
+    for sessoes in SESSOES:
+        cvs = [[cv_sintetico(int(rng.integers(200, 600)), rng) for _ in range(CVS_POR_SESSAO)]
+               for _ in range(sessoes)]
+        for modo, executar in (("direto", recomendar_cv),
+                               ("executor", lambda cv: executor.executar(recomendar_cv, cv))):
+            latencias, recusas, duracao = carga(executar, sessoes, cvs)
+            p50, p95, p99 = np.percentile(latencias * 1000, [50, 95, 99])
+            print(f"{sessoes:>7} | {modo:>8} | {p50:8.0f} | {p95:8.0f} | {p99:8.0f} | "
+                  f"{len(latencias) / duracao:6.1f} | {recusas:>9}")
+    metricas = executor.metricas()
+    print(f"Executor: espera p95 {metricas['espera_p95_ms']:.0f} ms, "
+          f"duração p95 {metricas['duracao_p95_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,65 @@
+"""Tempo de extração de texto: loop original (todas as páginas, `text +=`) versus
+extrair_texto_pdf sem limites (paralela) e com os limites padrão de configuracao.
+
+Executar a partir da raiz do projeto:
+    python -m benchmarks.bench_extracao_pdf
+"""
+import time
+
+import fitz
+
+from aplicacao.utils.extracao_pdf import extrair_texto_pdf
+
+PAGINAS = [2, 20, 300]
+LINHA = "Experiência profissional com Python, SQL e projetos de dados em empresa de tecnologia. "
+
+
+def pdf_sintetico(paginas):
+    doc = fitz.open()
+    for numero in range(paginas):
+        pagina = doc.new_page()
+        texto = f"Página {numero}\n" + "\n".join(LINHA for _ in range(45))
+        pagina.insert_textbox(pagina.rect + (36, 36, -36, -36), texto, fontsize=9)
+    conteudo = doc.tobytes()
+    doc.close()
+    return conteudo
+
+
+def extracao_original(conteudo):
+    text = ""
+    with fitz.open(stream=conteudo, filetype="pdf") as doc:
+        for page in doc:
+            text += page.get_text()
+    return text
+
+
+def cronometrar(func, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, min(tempos)
+
+
+def main():
+    # Primeira chamada paralela sobe os processos; fica fora da medição
+    extrair_texto_pdf(pdf_sintetico(20), max_paginas=10**6, caracteres_suficientes=10**12)
+
+    print(f"{'páginas':>7} | {'original (s)':>12} | {'sem limites (s)':>15} | "
+          f"{'com limites (s)':>15} | {'páginas lidas':>13} | parada")
+    for paginas in PAGINAS:
+        conteudo = pdf_sintetico(paginas)
+        original, t_original = cronometrar(lambda: extracao_original(conteudo))
+        completo, t_completo = cronometrar(lambda: extrair_texto_pdf(
+            conteudo, max_paginas=10**6, caracteres_suficientes=10**12))
+        assert completo["texto"] == original
+        limitado, t_limitado = cronometrar(lambda: extrair_texto_pdf(conteudo))
+        print(f"{paginas:>7} | {t_original:12.3f} | {t_completo:15.3f} | {t_limitado:15.3f} | "
+              f"{limitado['paginas_lidas']:>13} | {limitado['motivo_parada']}")
+        print(f"{'':>7}   etapas (com limites): " + ", ".join(
+            f"{etapa} {segundos * 1000:.1f} ms" for etapa, segundos in limitado["tempos"].items()))
+
+
+if __name__ == "__main__":
+    main()
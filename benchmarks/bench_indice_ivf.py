@@ -0,0 +1,69 @@
+"""Recall e latência do índice IVF versus a varredura exata, em catálogos sintéticos.
+
+recall@5 compara o top-5 por probabilidade do ensemble (o que a página 1 mostra);
+recall@10 sim compara os 10 vizinhos mais similares, a métrica usual de ANN.
+Executar a partir da raiz do projeto:
+    python -m benchmarks.bench_indice_ivf
+"""
+import time
+
+import numpy as np
+
+from aplicacao.utils.indice_ivf import IndiceIVF, construir_indice_ivf
+from aplicacao.utils.motor_recomendacao import (
+    CAMINHO_TABELA_ENSEMBLE, pontuar_tabela, recomendar, selecionar_top_k)
+from benchmarks.bench_indice_quantizado import catalogo_agrupado, metadados_minimos
+
+TAMANHOS = [100_000, 1_000_000]
+NPROBES = [4, 16, 64]
+CONSULTAS = 50
+TOP_N = 5
+
+
+def main():
+    rng = np.random.default_rng(42)
+    tabela = np.load(CAMINHO_TABELA_ENSEMBLE)
+    pontuar = lambda sims: pontuar_tabela(sims, tabela)
+
+    print(f"{'vagas':>10} | {'busca':>10} | {'recall@5':>8} | {'recall@10 sim':>13} | "
+          f"{'p50 (ms)':>8} | {'p99 (ms)':>8}")
+    for n in TAMANHOS:
+        embeddings, centros = catalogo_agrupado(n, rng)
+        metadados = metadados_minimos(n)
+        consultas = centros[rng.integers(0, len(centros), CONSULTAS)]
+        consultas = consultas + 0.7 * rng.standard_normal(consultas.shape, dtype=np.float32)
+        consultas /= np.linalg.norm(consultas, axis=1, keepdims=True)
+
+        inicio = time.perf_counter()
+        centroides, ordem, inicios = construir_indice_ivf(embeddings)
+        print(f"{n:>10} | IVF com {len(centroides)} listas construído em "
+              f"{time.perf_counter() - inicio:.1f}s")
+
+        referencia, vizinhos, tempos = [], [], []
+        for q in consultas:
+            inicio = time.perf_counter()
+            df = recomendar(q, embeddings, metadados, pontuar, TOP_N)
+            tempos.append(time.perf_counter() - inicio)
+            referencia.append(set(df["id_vaga"]))
+            vizinhos.append(set(selecionar_top_k(embeddings @ q, 10)))
+        p50, p99 = np.percentile(tempos, [50, 99]) * 1000
+        print(f"{n:>10} | {'exata':>10} | {1.0:8.3f} | {1.0:13.3f} | {p50:8.1f} | {p99:8.1f}")
+
+        for nprobe in NPROBES:
+            indice = IndiceIVF(centroides, ordem, inicios, nprobe)
+            acertos = acertos_sim = 0
+            tempos = []
+            for q, esperado, proximos in zip(consultas, referencia, vizinhos):
+                inicio = time.perf_counter()
+                df = recomendar(q, embeddings, metadados, pontuar, TOP_N, indice=indice)
+                tempos.append(time.perf_counter() - inicio)
+                acertos += len(esperado & set(df["id_vaga"]))
+                acertos_sim += len(proximos & set(indice.candidatos(q)))
+            p50, p99 = np.percentile(tempos, [50, 99]) * 1000
+            rotulo = f"nprobe={nprobe}"
+            print(f"{n:>10} | {rotulo:>10} | {acertos / (TOP_N * CONSULTAS):8.3f} | "
+                  f"{acertos_sim / (10 * CONSULTAS):13.3f} | {p50:8.1f} | {p99:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
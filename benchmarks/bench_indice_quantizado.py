@@ -0,0 +1,74 @@
+"""Recall@5 e latência da busca int8 com reordenação exata versus a varredura float32.
+
+O recall é medido sobre o top-5 por probabilidade do ensemble (tabela exportada),
+que é o que a página 1 mostra. Executar a partir da raiz do projeto:
+    python -m benchmarks.bench_indice_quantizado
+"""
+import time
+
+import numpy as np
+
+from aplicacao.utils.artefato_vagas import normalizar
+from aplicacao.utils.indice_quantizado import IndiceInt8, quantizar_int8
+from aplicacao.utils.motor_recomendacao import (
+    CAMINHO_TABELA_ENSEMBLE, pontuar_tabela, recomendar)
+
+TAMANHOS = [100_000, 1_000_000]
+SHORTLISTS = [300, 1000, 3000]
+DIMENSAO = 384
+CONSULTAS = 50
+TOP_N = 5
+
+
+def catalogo_agrupado(n, rng, grupos=256):
+    """Embeddings em grupos, mais parecidos com os de texto que ruído puro"""
+    centros = rng.standard_normal((grupos, DIMENSAO), dtype=np.float32)
+    rotulos = rng.integers(0, grupos, n)
+    embeddings = centros[rotulos]
+    embeddings += 0.7 * rng.standard_normal((n, DIMENSAO), dtype=np.float32)
+    return normalizar(embeddings), centros
+
+
+def metadados_minimos(n):
+    ids = np.arange(n).astype(str).astype(object)
+    return {chave: ids for chave in
+            ("id_vaga", "titulo_da_vaga", "area", "habilidades", "atividades")}
+
+
+def main():
+    rng = np.random.default_rng(42)
+    tabela = np.load(CAMINHO_TABELA_ENSEMBLE)
+    pontuar = lambda sims: pontuar_tabela(sims, tabela)
+
+    print(f"{'vagas':>10} | {'busca':>12} | {'recall@5':>8} | {'p50 (ms)':>8} | {'p99 (ms)':>8}")
+    for n in TAMANHOS:
+        embeddings, centros = catalogo_agrupado(n, rng)
+        codigos, escalas = quantizar_int8(embeddings)
+        metadados = metadados_minimos(n)
+        consultas = centros[rng.integers(0, len(centros), CONSULTAS)]
+        consultas = consultas + 0.7 * rng.standard_normal(consultas.shape, dtype=np.float32)
+
+        referencia, tempos = [], []
+        for q in consultas:
+            inicio = time.perf_counter()
+            df = recomendar(q, embeddings, metadados, pontuar, TOP_N)
+            tempos.append(time.perf_counter() - inicio)
+            referencia.append(set(df["id_vaga"]))
+        p50, p99 = np.percentile(tempos, [50, 99]) * 1000
+        print(f"{n:>10} | {'exata':>12} | {1.0:8.3f} | {p50:8.1f} | {p99:8.1f}")
+
+        for tamanho in SHORTLISTS:
+            acertos, tempos = 0, []
+            for q, esperado in zip(consultas, referencia):
+                inicio = time.perf_counter()
+                df = recomendar(q, embeddings, metadados, pontuar, TOP_N,
+                                indice=IndiceInt8(codigos, escalas, tamanho))
+                tempos.append(time.perf_counter() - inicio)
+                acertos += len(esperado & set(df["id_vaga"]))
+            p50, p99 = np.percentile(tempos, [50, 99]) * 1000
+            rotulo = f"int8+{tamanho}"
+            print(f"{n:>10} | {rotulo:>12} | {acertos / (TOP_N * CONSULTAS):8.3f} | {p50:8.1f} | {p99:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Vazão e latência da codificação de CVs com lotes dinâmicos (DespachanteLotes)
+versus um CV por chamada, com N sessões simultâneas enviando CVs seguidos.
+
+Executar a partir da raiz do projeto (aceita o caminho de um modelo local):
+    python -m benchmarks.bench_lote_dinamico [modelo]
+"""
+import sys
+
+import numpy as np
+
+from aplicacao.utils.codificador import carregar_codificador
+from aplicacao.utils.executor_inferencia import ExecutorInferencia
+from aplicacao.utils.lote_dinamico import DespachanteLotes
+from aplicacao.utils.preprocessamento import preprocessar
+from benchmarks.bench_codificacao_janelas import cv_sintetico
+from benchmarks.bench_executor_inferencia import carga
+from modelo import NOME_MODELO_EMBEDDINGS
+
+SESSOES = [1, 4, 16]
+CVS_POR_SESSAO = 8
+# (rótulo, tamanho máximo do lote, janela de espera em ms); tamanho 1 = sem lotes
+CONFIGURACOES = [("sem lote", 1, 0), ("lote 0ms", 16, 0), ("lote 2ms", 16, 2), ("lote 10ms", 16, 10)]
+
+
+def main(nome_modelo=NOME_MODELO_EMBEDDINGS):
+    rng = np.random.default_rng(42)
+    model = carregar_codificador(nome_modelo, "torch")
+    model.encode(["aquecimento"])
+    executor = ExecutorInferencia(tamanho_fila=64)
+
+    def codificar_lote(textos):
+        return model.encode(textos, batch_size=len(textos))
+
+    print(f"{CVS_POR_SESSAO} CVs por sessão, {executor.trabalhadores} trabalhadores x "
+          f"{executor.threads_por_trabalhador} threads")
+    print(f"{'sessões':>7} | {'modo':>9} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'CVs/s':>6} | "
+          f"{'lote médio':>10}")
+    for sessoes in SESSOES:
+        cvs = [[cv_sintetico(int(rng.integers(200, 600)), rng) for _ in range(CVS_POR_SESSAO)]
+               for _ in range(sessoes)]
+        for rotulo, tamanho_maximo, espera_ms in CONFIGURACOES:
+            despachante = DespachanteLotes(
+                lambda textos: executor.executar(codificar_lote, textos), tamanho_maximo,
+                espera_ms, executor.trabalhadores)
+            if tamanho_maximo == 1:
+                def executar(cv):
+                    return executor.executar(codificar_lote, [preprocessar(cv)])
+            else:
+                def executar(cv):
+                    return despachante.codificar(preprocessar(cv))
+            latencias, _, duracao = carga(executar, sessoes, cvs)
+            p50, p95 = np.percentile(latencias * 1000, [50, 95])
+            lote_medio = despachante.metricas()["tamanho_medio"] if tamanho_maximo > 1 else 1.0
+            print(f"{sessoes:>7} | {rotulo:>9} | {p50:8.0f} | {p95:8.0f} | "
+                  f"{len(latencias) / duracao:6.1f} | {lote_medio:10.1f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,98 @@
+"""Trabalho de dados da página 4 a cada execução do script: antes, o quadro era refeito
+de prospects_json (laço em Python, apply da situação e to_datetime) a cada
+interação; agora é montado uma vez (montar_painel_candidatos) e a página só
+filtra e agrega.
+
+Usa um prospects_json sintético, com N prospects e 50 por vaga.
+Executar a partir da raiz do projeto:
+    python -m benchmarks.bench_painel_candidatos
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from aplicacao.utils.carregar_dados import montar_prospects_df, montar_titulos_vagas
+from aplicacao.utils.preparar_candidatos_df import APROVADOS, montar_painel_candidatos
+from aplicacao.utils.snapshot_dados import tipar_colunas
+from aplicacao.utils.utils import contar_presentes
+
+TAMANHOS = [100_000, 1_000_000]
+POR_VAGA = 50
+SITUACOES = APROVADOS + ["Encaminhado ao Requisitante", "Inscrito", "Não Aprovado pelo Cliente",
+                         "Desistiu", "Prospect", "Entrevista Técnica"]
+
+
+def prospects_sinteticos(n, rng):
+    datas = pd.date_range("2019-01-01", "2024-12-31").strftime("%d-%m-%Y").to_numpy()
+    situacoes = rng.choice(SITUACOES, n)
+    recrutadores = rng.choice([f"Recrutador {i}" for i in range(60)], n)
+    dias = rng.choice(datas, n)
+    prospects_json = {}
+    for inicio in range(0, n, POR_VAGA):
+        job_id = str(inicio // POR_VAGA)
+        prospects_json[job_id] = {
+            "titulo": f"Vaga {job_id}", "modalidade": "",
+            "prospects": [{"nome": f"Candidato {i}", "codigo": str(i),
+                           "situacao_candidado": situacoes[i], "data_candidatura": dias[i],
+                           "recrutador": recrutadores[i]}
+                          for i in range(inicio, min(inicio + POR_VAGA, n))]}
+    return prospects_json
+
+
+def fatiar(prospects_df, mensal):
+    """O que a página faz com o quadro pronto: métricas, opções dos filtros e gráficos"""
+    len(prospects_df)
+    int((prospects_df['situacao_candidado_agrupado'] == "Aprovado").sum())
+    prospects_df['recrutador'].mode()
+    for coluna in ('situacao_candidado_agrupado', 'recrutador', 'titulo_vaga'):
+        prospects_df[coluna].unique()
+    filtrado = prospects_df[prospects_df['situacao_candidado_agrupado'].isin(["Aprovado"])]
+    contar_presentes(filtrado['situacao_candidado_agrupado'])
+    contar_presentes(filtrado['recrutador'])
+    mensal(filtrado)
+
+
+def como_antes(prospects_json):
+    """O processamento que a página 4 repetia a cada execução"""
+    lista = []
+    for vaga_info in prospects_json.values():
+        for prospect in vaga_info.get("prospects", []):
+            lista.append({**prospect, 'titulo_vaga': vaga_info.get("titulo", ""),
+                          'modalidade': vaga_info.get("modalidade", "")})
+    prospects_df = pd.DataFrame(lista)
+    prospects_df['situacao_candidado_agrupado'] = prospects_df['situacao_candidado'].apply(
+        lambda x: "Aprovado" if x in APROVADOS else x)
+    prospects_df = prospects_df.copy()
+    prospects_df['data'] = pd.to_datetime(prospects_df['data_candidatura'], errors='coerce')
+    fatiar(prospects_df, lambda filtrado: filtrado.resample('M', on='data').size())
+
+
+def cronometrar(func, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return float(np.median(tempos)) * 1000
+
+
+def main():
+    rng = np.random.default_rng(42)
+    print(f"{'prospects':>9} | {'antes, por execução (ms)':>24} | {'montagem única (ms)':>19} | "
+          f"{'agora, por execução (ms)':>24}")
+    for n in TAMANHOS:
+        prospects_json = prospects_sinteticos(n, rng)
+        # Como no snapshot: montado e tipado quando os JSONs mudam
+        prospects_df = tipar_colunas(montar_prospects_df(prospects_json))
+        titulos_vagas_df = montar_titulos_vagas(prospects_json)
+        painel = montar_painel_candidatos(prospects_df, titulos_vagas_df)
+        antes = cronometrar(lambda: como_antes(prospects_json), repeticoes=1)
+        montagem = cronometrar(lambda: montar_painel_candidatos(prospects_df, titulos_vagas_df))
+        agora = cronometrar(lambda: fatiar(
+            painel, lambda filtrado: filtrado['mes_candidatura'].value_counts().resample('M').sum()))
+        print(f"{n:>9} | {antes:24.0f} | {montagem:19.0f} | {agora:24.0f}")
+
+
+if __name__ == "__main__":
+    main()
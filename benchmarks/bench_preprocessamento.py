@@ -0,0 +1,71 @@
+"""Vazão do pré-processamento sobre todos os CVs (cv_pt) do applicants.json: as duas
+implementações antigas (modelo.py com word_tokenize e a da página 1 com split)
+versus aplicacao.utils.preprocessamento, texto a texto e em lote com processos.
+
+Executar a partir da raiz do projeto, com aplicacao/dados/applicants.json presente:
+    python -m benchmarks.bench_preprocessamento
+"""
+import json
+import os
+import re
+import string
+import time
+
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+
+from aplicacao.utils.preprocessamento import preprocessar, preprocessar_lote
+
+
+def preprocess_treino(text):
+    stop_words = set(stopwords.words('portuguese'))
+    text = text.lower()
+    text = re.sub(r'\d+', '', text)
+    text = text.translate(str.maketrans('', '', string.punctuation))
+    tokens = word_tokenize(text, language="portuguese")
+    tokens = [
+        word for word in tokens if word not in stop_words and len(word) > 2]
+    return ' '.join(tokens)
+
+
+def preprocess_pagina(text):
+    stop_words = set(stopwords.words('portuguese'))
+    text = text.lower()
+    text = re.sub(r'\d+', '', text)
+    text = text.translate(str.maketrans('', '', string.punctuation))
+    tokens = [word for word in text.split() if word not in stop_words and len(word) > 2]
+    return ' '.join(tokens)
+
+
+def cronometrar(rotulo, func, textos, referencia=None):
+    inicio = time.perf_counter()
+    resultado = func(textos)
+    duracao = time.perf_counter() - inicio
+    megabytes = sum(len(t) for t in textos) / 2**20
+    iguais = "" if referencia is None else f"   iguais ao treino: {resultado == referencia}"
+    print(f"{rotulo:>34} | {duracao:8.2f} | {len(textos) / duracao:9.0f} | {megabytes / duracao:6.1f}{iguais}")
+    return resultado
+
+
+def main():
+    with open("aplicacao/dados/applicants.json", encoding="utf-8") as f:
+        applicants = json.load(f)
+    textos = [dados.get("cv_pt", "") for dados in applicants.values()]
+    del applicants
+
+    print(f"{len(textos)} CVs, {sum(len(t) for t in textos) / 2**20:.1f} MB, {os.cpu_count()} núcleos")
+    print(f"{'implementação':>34} | {'tempo (s)':>8} | {'textos/s':>9} | {'MB/s':>6}")
+    referencia = cronometrar("modelo.preprocess (word_tokenize)",
+                             lambda ts: [preprocess_treino(t) for t in ts], textos)
+    cronometrar("página 1 (split)", lambda ts: [preprocess_pagina(t) for t in ts], textos)
+    cronometrar("preprocessar, texto a texto", lambda ts: [preprocessar(t) for t in ts],
+                textos, referencia)
+    cronometrar("preprocessar_lote, 1 processo", lambda ts: preprocessar_lote(ts, processos=1),
+                textos, referencia)
+    if (os.cpu_count() or 1) > 1:
+        cronometrar(f"preprocessar_lote, {os.cpu_count()} processos", preprocessar_lote,
+                    textos, referencia)
+
+
+if __name__ == "__main__":
+    main()
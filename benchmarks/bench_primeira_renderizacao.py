@@ -0,0 +1,57 @@
+"""Tempo até a primeira renderização de cada página do app, cada página em um processo
+novo (imports e carregamentos a frio), e o tempo de uma segunda execução do script.
+
+Executar a partir da raiz do projeto, com os dados em aplicacao/dados e os artefatos
+em aplicacao/modelo (aceita o caminho de outro app_main.py, p.ex. de outra versão):
+    python -m benchmarks.bench_primeira_renderizacao [app_main.py]
+"""
+import json
+import os
+import subprocess
+import sys
+
+PAGINAS = [
+    "1. Predição de Aprovação",
+    "2. Visão Geral",
+    "3. Análise de Vagas",
+    "4. Análise de Candidatos",
+]
+
+_MEDICAO = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+script, pagina = sys.argv[1:3]
+at = AppTest.from_file(script, default_timeout=600)
+at.session_state["menu_principal"] = pagina
+inicio = time.perf_counter()
+at.run()
+primeira = time.perf_counter() - inicio
+inicio = time.perf_counter()
+at.run()
+segunda = time.perf_counter() - inicio
+print(json.dumps({"primeira": primeira, "segunda": segunda,
+                  "erros": [str(e.value)[:80] for e in list(at.exception) + list(at.error)],
+                  "torch": "torch" in sys.modules, "sklearn": "sklearn" in sys.modules}))
+"""
+
+
+def medir(script, pagina):
+    ambiente = dict(os.environ, PYTHONPATH=os.path.dirname(script))
+    saida = subprocess.run([sys.executable, "-c", _MEDICAO, script, pagina], env=ambiente,
+                           capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main(script="app_main.py"):
+    script = os.path.abspath(script)
+    print(f"{'página':<26} | {'1ª render (s)':>13} | {'2ª render (s)':>13} | "
+          f"{'torch':>5} | {'sklearn':>7} | erros")
+    for pagina in PAGINAS:
+        r = medir(script, pagina)
+        print(f"{pagina:<26} | {r['primeira']:13.2f} | {r['segunda']:13.2f} | "
+              f"{'sim' if r['torch'] else 'não':>5} | {'sim' if r['sklearn'] else 'não':>7} | "
+              f"{r['erros'] or '-'}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
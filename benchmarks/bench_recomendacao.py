@@ -0,0 +1,121 @@
+"""Latência por CV de predict_jobs_for_cv conforme o catálogo de vagas cresce.
+
+Executar a partir da raiz do projeto:
+    python -m benchmarks.bench_recomendacao
+"""
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from aplicacao.utils.motor_recomendacao import (
+    CAMINHO_TABELA_ENSEMBLE, montar_metadados_vagas, montar_recomendacoes,
+    pontuar_ensemble, pontuar_tabela, selecionar_top_k)
+
+warnings.simplefilter("ignore")
+
+TAMANHOS = [1_000, 10_000, 100_000, 1_000_000]
+# O caminho antigo faz duas chamadas predict_proba por vaga; acima disso só extrapolamos
+LIMITE_CAMINHO_ANTIGO = 10_000
+DIMENSAO = 384
+
+
+def catalogo_sintetico(n, rng):
+    job_ids = [str(i) for i in range(n)]
+    jobs = {
+        jid: {
+            "informacoes_basicas": {"titulo_vaga": f"Vaga {jid}"},
+            "perfil_vaga": {
+                "areas_atuacao": f"Área {int(jid) % 17}",
+                "competencia_tecnicas_e_comportamentais": "python, sql",
+                "principais_atividades": "desenvolvimento",
+            },
+        }
+        for jid in job_ids
+    }
+    embeddings = rng.standard_normal((n, DIMENSAO), dtype=np.float32)
+    return jobs, job_ids, embeddings
+
+
+def caminho_antigo(sims, jobs, job_ids, logreg, xgb, top_n=5):
+    results = []
+    for i, sim in enumerate(sims):
+        logreg_prob = logreg.predict_proba([[sim]])[0][1]
+        xgb_prob = xgb.predict_proba([[sim]])[0][1]
+        job = jobs.get(job_ids[i], {})
+        results.append({
+            "id_vaga": job_ids[i],
+            "titulo_da_vaga": job.get("informacoes_basicas", {}).get("titulo_vaga", "N/A"),
+            "area": job.get("perfil_vaga", {}).get("areas_atuacao", "N/A"),
+            "habilidades": job.get("perfil_vaga", {}).get("competencia_tecnicas_e_comportamentais", "Não informado"),
+            "atividades": job.get("perfil_vaga", {}).get("principais_atividades", "Não informado"),
+            "similaridade": sim,
+            "probabilidade_de_contratacao": (logreg_prob + xgb_prob) / 2
+        })
+    return pd.DataFrame(sorted(results, key=lambda x: x["probabilidade_de_contratacao"], reverse=True)[:top_n])
+
+
+def caminho_vetorizado(sims, metadados, logreg, xgb, top_n=5):
+    probs = pontuar_ensemble(sims, logreg, xgb)
+    top_idx = selecionar_top_k(probs, top_n)
+    return montar_recomendacoes(top_idx, metadados, sims[top_idx], probs[top_idx])
+
+
+def caminho_tabela(sims, metadados, tabela, top_n=5):
+    probs = pontuar_tabela(sims, tabela)
+    top_idx = selecionar_top_k(probs, top_n)
+    return montar_recomendacoes(top_idx, metadados, sims[top_idx], probs[top_idx])
+
+
+def cronometrar(func, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, float(np.median(tempos))
+
+
+def main():
+    rng = np.random.default_rng(42)
+    logreg = joblib.load("aplicacao/modelo/logistic_model.pkl")
+    xgb = joblib.load("aplicacao/modelo/xgboost_model.pkl")
+    tabela = np.load(CAMINHO_TABELA_ENSEMBLE) if os.path.exists(CAMINHO_TABELA_ENSEMBLE) else None
+
+    print(f"{'vagas':>10} | {'antigo (ms)':>12} | {'vetorizado (ms)':>15} | {'ganho':>7} | {'tabela (ms)':>11}")
+    for n in TAMANHOS:
+        jobs, job_ids, embeddings = catalogo_sintetico(n, rng)
+        metadados = montar_metadados_vagas(jobs, job_ids)
+        cv_vec = rng.standard_normal((1, DIMENSAO), dtype=np.float32)
+        norma = np.linalg.norm(embeddings, axis=1) * np.linalg.norm(cv_vec)
+        sims = (embeddings @ cv_vec[0]) / norma
+
+        novo, t_novo = cronometrar(
+            lambda: caminho_vetorizado(sims, metadados, logreg, xgb), 5)
+
+        if tabela is not None:
+            _, t_tabela = cronometrar(
+                lambda: caminho_tabela(sims, metadados, tabela), 5)
+            rotulo_tabela = f"{t_tabela * 1000:11.1f}"
+        else:
+            rotulo_tabela = f"{'-':>11}"
+
+        if n <= LIMITE_CAMINHO_ANTIGO:
+            antigo, t_antigo = cronometrar(
+                lambda: caminho_antigo(sims, jobs, job_ids, logreg, xgb), 1)
+            pd.testing.assert_frame_equal(
+                antigo.reset_index(drop=True), novo, check_dtype=False, check_exact=True)
+            rotulo_antigo = f"{t_antigo * 1000:12.1f}"
+            ganho = f"{t_antigo / t_novo:6.0f}x"
+        else:
+            rotulo_antigo = f"{'(omitido)':>12}"
+            ganho = f"{'-':>7}"
+
+        print(f"{n:>10} | {rotulo_antigo} | {t_novo * 1000:15.1f} | {ganho} | {rotulo_tabela}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Memória e latência da página 1 com os modelos em cada réplica do app versus no
+serviço de inferência (servico_inferencia) compartilhado.
+
+Cada réplica é um processo novo que carrega a página 1, espera o aquecimento e
+recomenda vagas para alguns CVs sem cache; no modo "serviço" ela só fala com o
+serviço, que roda em outro processo. A memória é o pico de RSS de cada processo.
+
+Executar a partir da raiz do projeto, com os artefatos de aplicacao/modelo:
+    python -m benchmarks.bench_servico_inferencia
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ENDERECO = "unix:/tmp/bench_servico_inferencia.sock"
+CVS = 20
+REPLICAS = [1, 2, 4]
+# Mesmo vocabulário de bench_codificacao_janelas, que não é importado porque traz o
+# sentence_transformers (e o torch) para a réplica
+PALAVRAS = ("experiência desenvolvimento sistemas python java sql cloud gestão projetos "
+            "equipe análise dados infraestrutura suporte implantação requisitos clientes "
+            "integração serviços banco relatórios automação testes").split()
+
+
+def replica():
+    """Roda como processo filho: mede uma réplica e imprime o resultado em JSON"""
+    from aplicacao.operacoes.pagina_1 import recomendar_para_pdf
+    from aplicacao.utils.registro_modelos import iniciar_aquecimento
+
+    iniciar_aquecimento().result()
+    rng = np.random.default_rng(42)
+    latencias = []
+    for i in range(CVS):
+        cv = " ".join(rng.choice(PALAVRAS, int(rng.integers(200, 600))))
+        inicio = time.perf_counter()
+        recomendar_para_pdf(f"bench-{i}", cv)
+        latencias.append(time.perf_counter() - inicio)
+    p50, p95 = np.percentile(np.array(latencias) * 1000, [50, 95])
+    print(json.dumps({"rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                      "p50_ms": p50, "p95_ms": p95}))
+
+
+def medir_replica(servico):
+    ambiente = {**os.environ, "DECISION_CACHE_CV_MEMORIA": "0", "DECISION_CACHE_CV_DISCO": "0",
+                "DECISION_SERVICO_INFERENCIA": ENDERECO if servico else ""}
+    saida = subprocess.run([sys.executable, "-m", "benchmarks.bench_servico_inferencia", "--replica"],
+                           env=ambiente, capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def rss_pico_mb(pid):
+    """Pico de RSS de outro processo (Linux)"""
+    with open(f"/proc/{pid}/status") as f:
+        for linha in f:
+            if linha.startswith("VmHWM:"):
+                return int(linha.split()[1]) / 1024
+    return float("nan")
+
+
+def main():
+    local = medir_replica(servico=False)
+    servico = subprocess.Popen([sys.executable, "-m", "aplicacao.utils.servico_inferencia", ENDERECO],
+                               stdout=subprocess.PIPE, text=True)
+    try:
+        # O serviço só anuncia o endereço depois de carregar e aquecer os modelos
+        for linha in servico.stdout:
+            if linha.startswith("Serviço de inferência ouvindo"):
+                break
+        cliente = medir_replica(servico=True)
+        rss_servico = rss_pico_mb(servico.pid)
+    finally:
+        servico.terminate()
+        servico.wait()
+
+    print(f"{CVS} CVs por réplica, sem cache")
+    print(f"{'modo':>7} | {'RSS réplica (MB)':>16} | {'p50 (ms)':>8} | {'p95 (ms)':>8}")
+    for modo, r in (("local", local), ("serviço", cliente)):
+        print(f"{modo:>7} | {r['rss_mb']:16.0f} | {r['p50_ms']:8.1f} | {r['p95_ms']:8.1f}")
+    print(f"Serviço de inferência: {rss_servico:.0f} MB")
+    print(f"{'réplicas':>8} | {'RSS local (MB)':>14} | {'RSS com serviço (MB)':>20}")
+    for n in REPLICAS:
+        print(f"{n:>8} | {n * local['rss_mb']:14.0f} | {n * cliente['rss_mb'] + rss_servico:20.0f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--replica"]:
+        replica()
+    else:
+        main()
@@ -1,30 +1,30 @@
 import os
 import json
-import pickle
 import pandas as pd
 import joblib
+import numpy as np
 from sklearn.linear_model import LogisticRegression
 from xgboost import XGBClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, roc_auc_score, f1_score
 from sklearn.utils import resample
-from sentence_transformers import SentenceTransformer
 
-import re
-import string
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from aplicacao.utils import configuracao
+from aplicacao.utils.artefato_vagas import salvar_artefato_vagas
+from aplicacao.utils.base_candidatos import construir_base_candidatos
+from aplicacao.utils.cache_embeddings import CacheEmbeddings
+from aplicacao.utils.carregar_dados import garantir_dados_extraidos, identidade_fontes
+from aplicacao.utils.codificacao_janelas import codificar_em_janelas
+from aplicacao.utils.codificacao_lote import codificar_em_lote
+from aplicacao.utils.codificador import carregar_codificador
+from aplicacao.utils.ingestao_incremental import reaplicar_deltas_vagas
+from aplicacao.utils.motor_recomendacao import (
+    CAMINHO_TABELA_ENSEMBLE, pontuar_ensemble, pontuar_tabela)
+from aplicacao.utils.preprocessamento import VERSAO_PREPROCESSAMENTO, preprocessar_lote
 
-
-def preprocess(text):
-    stop_words = set(stopwords.words('portuguese'))
-    text = text.lower()
-    text = re.sub(r'\d+', '', text)
-    text = text.translate(str.maketrans('', '', string.punctuation))
-    tokens = word_tokenize(text, language="portuguese")
-    tokens = [
-        word for word in tokens if word not in stop_words and len(word) > 2]
-    return ' '.join(tokens)
+NOME_MODELO_EMBEDDINGS = 'paraphrase-multilingual-MiniLM-L12-v2'
+# A partir deste número de textos compensa subir o pool de processos de codificação
+MINIMO_CODIFICACAO_PARALELA = 5000
 
 
 def extract_job_requirements(job):
@@ -81,26 +81,132 @@ def carregar_modelo():
     joblib.dump(logreg, "aplicacao/modelo/logistic_model.pkl")
     joblib.dump(xgb, "aplicacao/modelo/xgboost_model.pkl")
 
+    exportar_tabela_ensemble()
+
+
+def codificar_textos(model, textos, caminho_parcial, backend="torch"):
+    """Codifica com o próprio modelo ou, para muitos textos, com o pool de processos"""
+    if len(textos) < MINIMO_CODIFICACAO_PARALELA:
+        return model.encode(textos, show_progress_bar=True)
+    saida = codificar_em_lote(textos, NOME_MODELO_EMBEDDINGS, caminho_parcial, backend=backend)
+    vetores = np.array(saida)
+    del saida
+    os.remove(caminho_parcial)
+    return vetores
+
 
-def gerar_embeddings_vagas():
+def versao_embeddings_vagas(pooling_janelas=None, backend="torch"):
+    """Versão do cache de embeddings das vagas: pré-processamento, modo de codificação e backend"""
+    versao = VERSAO_PREPROCESSAMENTO if pooling_janelas is None else \
+        f"{VERSAO_PREPROCESSAMENTO}:janelas-{pooling_janelas}"
+    return versao if backend == "torch" else f"{versao}:{backend}"
+
+
+def gerar_embeddings_vagas(pooling_janelas=None, backend=None):
+    """Embeddings das vagas; com `pooling_janelas` ("media", "max", "ponderada") as
+    descrições longas são codificadas inteiras, em janelas de tokens. `backend`
+    (padrão: configuracao.BACKEND_CODIFICADOR) deve ser o mesmo do servidor"""
+    garantir_dados_extraidos()
     with open('aplicacao/dados/vagas.json', encoding='utf-8') as f:
         jobs = json.load(f)
+    # Vagas novas, alteradas e removidas pelos deltas já ingeridos (ingestao_incremental)
+    jobs = reaplicar_deltas_vagas(jobs, identidade_fontes())
 
-    model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+    backend = backend or configuracao.BACKEND_CODIFICADOR
+    model = carregar_codificador(NOME_MODELO_EMBEDDINGS, backend)
+    cache = CacheEmbeddings(NOME_MODELO_EMBEDDINGS, versao_embeddings_vagas(pooling_janelas, backend))
 
     job_ids = list(jobs.keys())
-    job_texts = [preprocess(extract_job_requirements(jobs[jid]))
-                 for jid in job_ids]
-    job_embeddings = model.encode(job_texts, show_progress_bar=True)
+    job_texts = preprocessar_lote(
+        extract_job_requirements(jobs[jid]) for jid in job_ids)
+    if pooling_janelas is None:
+        def codificar(textos):
+            return codificar_textos(model, textos, "aplicacao/modelo/.codificacao_vagas.npy", backend)
+    else:
+        def codificar(textos):
+            return codificar_em_janelas(model, textos, pooling_janelas)
+    # Só as vagas novas ou com texto alterado passam pelo modelo
+    job_embeddings = cache.codificar(job_texts, codificar)
+    cache.relatorio()
+    cache.salvar(podar=True)
     job_titles = [jobs[jid]["informacoes_basicas"]["titulo_vaga"]
                   for jid in job_ids]
 
     os.makedirs("aplicacao/modelo", exist_ok=True)
-    joblib.dump({
-        "job_ids": job_ids,
-        "job_titles": job_titles,
-        "job_embeddings": job_embeddings
-    }, "aplicacao/modelo/job_data.pkl")
-
-    with open("aplicacao/modelo/vagas.pkl", "wb") as f:
-        pickle.dump(jobs, f)
+    # Reconstrução completa: o IVF (se o catálogo tiver um) treina centróides novos
+    salvar_artefato_vagas(job_ids, job_titles, job_embeddings, retreinar_ivf=True, jobs=jobs)
+
+
+def migrar_job_data_pkl(caminho_pkl="aplicacao/modelo/job_data.pkl"):
+    """Converte um job_data.pkl já gerado para o artefato mmap, sem recodificar"""
+    job_data = joblib.load(caminho_pkl)
+    salvar_artefato_vagas(
+        job_data["job_ids"], job_data["job_titles"], job_data["job_embeddings"])
+
+
+def gerar_embeddings_candidatos():
+    """Embeddings dos CVs de todos os candidatos, retomável se interrompido"""
+    with open('aplicacao/dados/applicants.json', encoding='utf-8') as f:
+        applicants = json.load(f)
+
+    codigos = list(applicants.keys())
+    textos = preprocessar_lote(applicants[codigo].get("cv_pt", "") for codigo in codigos)
+    del applicants
+
+    os.makedirs("aplicacao/modelo", exist_ok=True)
+    codificar_em_lote(textos, NOME_MODELO_EMBEDDINGS,
+                      "aplicacao/modelo/applicant_embeddings.npy")
+    with open("aplicacao/modelo/applicant_ids.json", "w", encoding="utf-8") as f:
+        json.dump({"versao_preprocessamento": VERSAO_PREPROCESSAMENTO,
+                   "modelo": NOME_MODELO_EMBEDDINGS, "codigos": codigos}, f)
+
+
+def gerar_base_candidatos():
+    """Base SQLite consultada pelos detalhes de candidato da página 4; o app só a abre,
+    já que gerá-la exige o parse do applicants.json inteiro"""
+    garantir_dados_extraidos()
+    construir_base_candidatos()
+
+
+def _limiares_xgb(xgb):
+    # Pontos de corte das árvores: o XGBoost é constante por partes entre eles
+    arvores = xgb.get_booster().trees_to_dataframe()
+    limiares = arvores["Split"].dropna().to_numpy(dtype=np.float32)
+    limiares = limiares[(limiares > -1) & (limiares <= 1)]
+    # Inclui o float32 imediatamente anterior para a interpolação reproduzir o degrau
+    anteriores = np.nextafter(limiares, np.float32(-np.inf))
+    return np.concatenate([limiares, anteriores]).astype(np.float64)
+
+
+def verificar_tabela_ensemble(tabela, logreg, xgb, n_amostras=1_000_000, tolerancia=1e-6):
+    rng = np.random.default_rng(42)
+    amostras = rng.uniform(-1, 1, n_amostras).astype(np.float32)
+    # Reforça a amostragem em torno dos degraus do XGBoost
+    perto_limiares = _limiares_xgb(xgb).astype(np.float32)
+    amostras = np.concatenate([amostras, perto_limiares, np.float32([-1, 0, 1])])
+
+    erro = np.abs(pontuar_tabela(amostras, tabela) -
+                  pontuar_ensemble(amostras, logreg, xgb))
+    print(f"Tabela do ensemble: {tabela.shape[1]} pontos, "
+          f"erro máximo {erro.max():.2e}, erro médio {erro.mean():.2e}")
+    if erro.max() > tolerancia:
+        raise ValueError(
+            f"Erro máximo da tabela ({erro.max():.2e}) acima da tolerância ({tolerancia:.0e})")
+    return erro.max()
+
+
+def exportar_tabela_ensemble(n_pontos=16385, tolerancia=1e-6):
+    logreg = joblib.load("aplicacao/modelo/logistic_model.pkl")
+    xgb = joblib.load("aplicacao/modelo/xgboost_model.pkl")
+
+    grade = np.unique(np.concatenate([
+        np.linspace(-1, 1, n_pontos).astype(np.float32),
+        _limiares_xgb(xgb)
+    ]))
+    probs = pontuar_ensemble(grade.astype(np.float32), logreg, xgb)
+    tabela = np.vstack([grade, probs])
+
+    verificar_tabela_ensemble(tabela, logreg, xgb, tolerancia=tolerancia)
+
+    os.makedirs("aplicacao/modelo", exist_ok=True)
+    np.save(CAMINHO_TABELA_ENSEMBLE, tabela)